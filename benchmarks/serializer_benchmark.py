@@ -0,0 +1,143 @@
+"""Measures how quickly task lists are loaded and saved by each JSON library.
+
+For each number of tasks, a task list is generated and then saved and loaded
+with every JSON library which is installed, as compact and as indented JSON.
+Saving includes converting the tasks to JSON objects and writing the file
+atomically, and loading includes reading the file and creating the tasks.
+
+Usage:
+    python benchmarks/serializer_benchmark.py [--sizes 1000 100000 1000000]
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from planner.core import serializer  # noqa: E402
+from planner.core.records import Task  # noqa: E402
+from planner.core.storage import write_atomically  # noqa: E402
+
+SUBJECTS = ("Mathematics", "Further Mathematics", "Computer Science", "Physics")
+FIRST_DUE_DATE = date(2021, 6, 28).toordinal()
+
+
+def generate_tasks(count: int) -> list:
+    """Generates a list of tasks with varied subjects and due dates."""
+    return [
+        Task(
+            task_id,
+            f"Task {task_id}",
+            SUBJECTS[task_id % len(SUBJECTS)],
+            FIRST_DUE_DATE + task_id % 365,
+            task_id % 3 == 0,
+        )
+        for task_id in range(count)
+    ]
+
+
+def installed_serializers() -> list:
+    """Gets the names of the JSON libraries which are installed."""
+    names = []
+    for name in serializer.SERIALIZERS:
+        try:
+            importlib.import_module(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def benchmark(task_list: list, path: str, pretty: bool) -> dict:
+    """Saves and loads the task list once.
+
+    Args:
+        task_list: Tasks to save.
+        path: Path of the file to save the tasks to.
+        pretty: Whether to save indented JSON.
+
+    Returns:
+        The seconds taken to save and to load, the seconds of which were spent
+        by the JSON library encoding and decoding, and the size of the file.
+    """
+    start_time = time.perf_counter()
+    data = [task.to_json() for task in task_list]
+    encode_start_time = time.perf_counter()
+    contents = serializer.dumps(data, pretty)
+    encode_time = time.perf_counter() - encode_start_time
+    save_file(path, contents)
+    save_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    with open(path, "rb") as data_file:
+        contents = data_file.read()
+    decode_start_time = time.perf_counter()
+    data = serializer.loads(contents)
+    decode_time = time.perf_counter() - decode_start_time
+    loaded = [Task.from_json(task) for task in data]
+    load_time = time.perf_counter() - start_time
+    assert len(loaded) == len(task_list)
+
+    return {
+        "save": save_time,
+        "encode": encode_time,
+        "load": load_time,
+        "decode": decode_time,
+        "size": os.path.getsize(path),
+    }
+
+
+def save_file(path: str, contents: str) -> None:
+    """Writes the file in the same way as the student planner."""
+    write_atomically(path, contents)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[1000, 100000, 1000000],
+        help="numbers of tasks to benchmark",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'tasks':>9} {'serializer':>10} {'format':>7} {'size (MB)':>10} "
+        f"{'save (tasks/s)':>15} {'encode (ms)':>12} "
+        f"{'load (tasks/s)':>15} {'decode (ms)':>12}"
+    )
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "task_list.json")
+        # Warms up each library so that the first results are not skewed.
+        for name in installed_serializers():
+            serializer.use_serializer(name)
+            benchmark(generate_tasks(1000), path, False)
+
+        for count in args.sizes:
+            task_list = generate_tasks(count)
+            for name in installed_serializers():
+                serializer.use_serializer(name)
+                for pretty in (False, True):
+                    result = benchmark(task_list, path, pretty)
+                    print(
+                        f"{count:>9} {name:>10} "
+                        f"{'pretty' if pretty else 'compact':>7} "
+                        f"{result['size'] / 1e6:>10.2f} "
+                        f"{count / result['save']:>15,.0f} "
+                        f"{result['encode'] * 1000:>12.1f} "
+                        f"{count / result['load']:>15,.0f} "
+                        f"{result['decode'] * 1000:>12.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
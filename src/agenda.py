@@ -4,46 +4,93 @@ Users may record their tasks and the details of each task. This includes
 information about the task title, subject, due date, and completion status.
 """
 
-import json
+import logging
 import sys
-from datetime import datetime
+import time
+from bisect import bisect_left, insort
+from dataclasses import replace
+from functools import partial
 
 from PyQt5 import QtWidgets
-from PyQt5.QtWidgets import QDialog, QMainWindow
-
+from PyQt5.QtCore import QAbstractTableModel, QDate, QModelIndex, Qt, QTimer
+from PyQt5.QtGui import QCloseEvent
+from PyQt5.QtWidgets import QDialog, QMainWindow, QMessageBox
+
+from my_subjects import subject_model
+from persistence import WriteBehindSaver
+from planner.core.instrumentation import configure_logging, timed
+from planner.core.records import TASK_COLUMNS, TASK_HEADERS, Task
+from planner.core.storage import AGENDA_HOLDER, CLI_HOLDER, LockedError, lock_tasks
+from planner.core.task_archive import (
+    archive_completed_tasks,
+    archived_terms,
+    old_completed_tasks,
+    read_archive,
+)
+from planner.core.task_search import DUE_DATE_VIEWS, TaskQuery, due_date_view
+from planner.core.task_store import TaskStore
+from planner.core.tasks import open_task_store_in_chunks
 from setup.add_task_setup import Ui_dialog_new_task
 from setup.agenda_setup import Ui_mwindow_agenda
+from setup.change_subject_setup import Ui_dialog_change_subject
+from setup.task_history_setup import Ui_dialog_task_history
+from undo import DeltaCommand, UndoStack
+
+logger = logging.getLogger(__name__)
+
+DUE_DATE_COLUMN = TASK_COLUMNS.index("due_date")
+
+# Seconds to wait for a command of the command line interface to finish when
+# the agenda is opened.
+CLI_LOCK_TIMEOUT = 5
+
+_task_lock = None
 
 
 def main() -> None:
     """Opens the agenda window on start-up."""
+    configure_logging()
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle("fusion")
-    mwindow_agenda = AgendaWindow()
+    try:
+        mwindow_agenda = AgendaWindow()
+    except LockedError as error:
+        QMessageBox.warning(None, "Agenda", str(error))
+        sys.exit(1)
     mwindow_agenda.show()
     sys.exit(app.exec_())
 
 
-def read_tasks() -> tuple:
-    """Reads existing JSON files for lists of tasks.
+def lock_agenda_tasks() -> None:
+    """Takes the lock on the tasks until the application exits.
+
+    If a command of the command line interface holds the lock, this tries
+    again until the command has finished, for up to CLI_LOCK_TIMEOUT seconds.
+    The command line interface cannot change the tasks after this.
 
-    Returns:
-        task_list: A list of all tasks.
-        task_list_hidden: A list of tasks excluding completed tasks.
+    Raises:
+        LockedError: Another copy of the student planner has the agenda open,
+                     or the command did not finish in time.
     """
-    with open("resources/task_list.json", "r") as outfile:
+    global _task_lock
+    deadline = time.monotonic() + CLI_LOCK_TIMEOUT
+    while _task_lock is None:
         try:
-            task_list = json.load(outfile)
-            json.dump(task_list, sys.stdout, ensure_ascii=False, indent=4)
-
-            with open("resources/task_list_hidden.json", "r") as outfile_hidden:
-                task_list_hidden = json.load(outfile_hidden)
-        except ValueError:
-            print("Empty JSON file.")
-            task_list = []
-            task_list_hidden = []
-
-    return task_list, task_list_hidden
+            _task_lock = lock_tasks(wait=False, holder=AGENDA_HOLDER)
+        except LockedError as error:
+            if error.holder != CLI_HOLDER:
+                raise LockedError(
+                    "The agenda is already open in another copy of the student "
+                    "planner, so close it first.",
+                    error.holder,
+                ) from error
+            if time.monotonic() > deadline:
+                raise LockedError(
+                    "A student-planner command is changing the tasks, so open "
+                    "the agenda again once it has finished.",
+                    error.holder,
+                ) from error
+            time.sleep(0.1)
 
 
 class AddTaskDialog(QDialog, Ui_dialog_new_task):
@@ -59,101 +106,635 @@ class AddTaskDialog(QDialog, Ui_dialog_new_task):
         self.setupUi(self)
 
 
+class ChangeSubjectDialog(QDialog, Ui_dialog_change_subject):
+    """Sets up the Change Subject dialog window."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setupUi(self)
+
+
+class TaskHistoryDialog(QDialog, Ui_dialog_task_history):
+    """Sets up the Task History dialog window, which displays archived tasks.
+
+    The archived tasks of a term are only read when the term is chosen.
+
+    Attributes:
+        task_model: Table model which displays the archived tasks.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setupUi(self)
+        self.task_model = None
+        self.comb_box_term.currentTextChanged.connect(self.show_term)
+        self.comb_box_term.addItems(archived_terms())
+
+    def show_term(self, term: str) -> None:
+        """Displays the archived tasks of a term."""
+        self.task_model = TaskTableModel(TaskStore(read_archive(term)))
+        self.task_model.set_show_completed(True)
+        self.table_view_history.setModel(self.task_model)
+        self.table_view_history.resizeColumnsToContents()
+
+
+class TaskTableModel(QAbstractTableModel):
+    """Serves the cells of the agenda on demand from the task store.
+
+    Changes are made through the model so that only the affected rows are
+    signalled to the view, rather than rebuilding the whole table. The ID of
+    the task in each row is stored in its item data under Qt.UserRole.
+
+    Like a filter proxy model, the model can display only the tasks which
+    match a search. The matching tasks are found once with the search index
+    of the task store, rather than by checking every row, and are then kept
+    up to date as tasks are changed.
+
+    The tasks are displayed in order of due date straight from the indexes
+    of the task store. When they are searched, or sorted by another column or
+    in descending order, the keys of the displayed tasks are instead sorted
+    once and then kept in order as tasks are changed. Tasks with the same
+    value in the sorted column are displayed in order of due date.
+
+    Attributes:
+        matched_keys: Keys of the displayed tasks, in ascending order of the
+                      sorted column and then due date, if a search or sort is
+                      applied.
+        query: Search which the displayed tasks match, or None to display all
+               tasks.
+        show_completed: Whether completed tasks are displayed.
+        sort_column: Column which the tasks are sorted by.
+        sort_order: Whether the tasks are sorted in ascending or descending
+                    order.
+        task_store: Store of all tasks in the agenda.
+    """
+
+    def __init__(self, task_store: TaskStore) -> None:
+        super().__init__()
+        self.matched_keys = []
+        self.query = None
+        self.show_completed = False
+        self.sort_column = DUE_DATE_COLUMN
+        self.sort_order = Qt.AscendingOrder
+        self.task_store = task_store
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        if self._uses_keys():
+            return len(self.matched_keys)
+        return self.task_store.count(self.show_completed)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(TASK_COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.UserRole):
+            return None
+        task = self.task_at(index.row())
+        if role == Qt.UserRole:
+            return task.task_id
+        return task.display(TASK_COLUMNS[index.column()])
+
+    def headerData(
+        self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole
+    ):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return TASK_HEADERS[section]
+        return section + 1
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder) -> None:
+        """Sorts the tasks by a column, and then by due date."""
+        if (column, order) == (self.sort_column, self.sort_order):
+            return
+        self.beginResetModel()
+        self.sort_column = column
+        self.sort_order = order
+        self._update_matches()
+        self.endResetModel()
+
+    def task_at(self, row: int) -> Task:
+        """Gets the task displayed in a row."""
+        if not self._uses_keys():
+            return self.task_store.task_at(row, self.show_completed)
+        if self.sort_order == Qt.DescendingOrder:
+            row = len(self.matched_keys) - 1 - row
+        return self.task_store.get(self.matched_keys[row][-1])
+
+    def row(self, task: Task) -> int:
+        """Finds the row of a task, or the row it would be displayed in."""
+        if not self._uses_keys():
+            return self.task_store.row(task, self.show_completed)
+        key = self._key(task)
+        position = bisect_left(self.matched_keys, key)
+        if self.sort_order == Qt.AscendingOrder:
+            return position
+        displayed = position < len(self.matched_keys)
+        displayed = displayed and self.matched_keys[position] == key
+        return len(self.matched_keys) - position - displayed
+
+    def displays(self, task: Task) -> bool:
+        """Checks whether a task is, or would be, displayed."""
+        if self.query is not None:
+            return self._store_query().matches(task)
+        return self.show_completed or not task.completed
+
+    def _uses_keys(self) -> bool:
+        """Checks whether the keys of the displayed tasks are kept in order."""
+        if self.query is not None:
+            return True
+        return (
+            self.sort_column != DUE_DATE_COLUMN or self.sort_order != Qt.AscendingOrder
+        )
+
+    def _key(self, task: Task) -> tuple:
+        """Gets the key which orders a task by the sorted column."""
+        key = self.task_store.due_key(task)
+        if self.sort_column == DUE_DATE_COLUMN:
+            return key
+        return (task.display(TASK_COLUMNS[self.sort_column]).casefold(), *key)
+
+    def _store_query(self) -> TaskQuery:
+        """Gets the search, including whether completed tasks are displayed."""
+        query = TaskQuery() if self.query is None else self.query
+        if self.show_completed:
+            return query
+        return replace(query, completed=False)
+
+    def _update_matches(self) -> None:
+        """Searches for the displayed tasks and sorts them."""
+        if not self._uses_keys():
+            self.matched_keys = []
+            return
+        keys = self.task_store.search(self._store_query())
+        if self.sort_column != DUE_DATE_COLUMN:
+            keys = sorted(self._key(self.task_store.get(key[1])) for key in keys)
+        self.matched_keys = keys
+
+    def _insert_row(self, task: Task, change) -> None:
+        """Displays a task in its row as a change to the store is made.
+
+        Args:
+            task: The task as it is displayed after the change.
+            change: Function which changes the store to include the task.
+        """
+        row = self.row(task)
+        self.beginInsertRows(QModelIndex(), row, row)
+        change()
+        if self._uses_keys():
+            insort(self.matched_keys, self._key(task))
+        self.endInsertRows()
+
+    def _remove_row(self, task: Task, change=None) -> None:
+        """Removes the row of a displayed task as a change to the store is made.
+
+        Args:
+            task: The task as it is displayed before the change.
+            change: Function which changes the store to exclude the task, or
+                    None if the store is changed afterwards.
+        """
+        row = self.row(task)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        if self._uses_keys():
+            del self.matched_keys[bisect_left(self.matched_keys, self._key(task))]
+        if change is not None:
+            change()
+        self.endRemoveRows()
+
+    def set_show_completed(self, show_completed: bool) -> None:
+        """Switches between displaying all tasks and incomplete tasks."""
+        self.beginResetModel()
+        self.show_completed = show_completed
+        self._update_matches()
+        self.endResetModel()
+
+    def set_query(self, query) -> None:
+        """Displays only the tasks which match a search.
+
+        Args:
+            query: Search which the tasks must match, or None to display all
+                   tasks.
+        """
+        self.beginResetModel()
+        self.query = query
+        self._update_matches()
+        self.endResetModel()
+
+    def change_tasks(self, change):
+        """Makes a change to many tasks, and then displays the tasks again once.
+
+        Args:
+            change: Function which changes the tasks in the store.
+
+        Returns:
+            The result of the change.
+        """
+        self.beginResetModel()
+        result = change()
+        self._update_matches()
+        self.endResetModel()
+        return result
+
+    def add_loaded_tasks(self, task_list: list) -> None:
+        """Adds tasks which have been read after the agenda was displayed."""
+        if self._uses_keys():
+            rows = None
+        else:
+            rows = self.task_store.insertion_rows(task_list, self.show_completed)
+        if rows is None:
+            self.beginResetModel()
+            self.task_store.extend(task_list)
+            self._update_matches()
+            self.endResetModel()
+        elif rows:
+            self.beginInsertRows(QModelIndex(), rows.start, rows.stop - 1)
+            self.task_store.extend(task_list)
+            self.endInsertRows()
+        else:
+            self.task_store.extend(task_list)
+
+    def add_task(self, task: Task) -> None:
+        """Adds a new task to the store in its sorted row."""
+        if self.displays(task):
+            self._insert_row(task, partial(self.task_store.add, task))
+        else:
+            self.task_store.add(task)
+
+    def set_completed(self, task_id: int, completed: bool) -> None:
+        """Marks the task with the given ID as complete/incomplete."""
+        task = self.task_store.get(task_id)
+        if task.completed == completed:
+            return
+        changed_task = replace(task, completed=completed)
+        change = partial(self.task_store.set_completed, task_id, completed)
+        was_displayed = self.displays(task)
+        is_displayed = self.displays(changed_task)
+        if was_displayed and is_displayed:
+            if self._key(task) == self._key(changed_task):
+                row = self.row(task)
+                change()
+                completed_column = TASK_COLUMNS.index("completed")
+                changed_index = self.index(row, completed_column)
+                self.dataChanged.emit(changed_index, changed_index, [Qt.DisplayRole])
+            else:
+                # The tasks are sorted by completion, so the task is moved.
+                self._remove_row(task)
+                self._insert_row(changed_task, change)
+        elif was_displayed:
+            # The task no longer matches what is displayed, so it is hidden.
+            self._remove_row(task, change)
+        elif is_displayed:
+            # The task now matches what is displayed, so it is shown.
+            self._insert_row(changed_task, change)
+        else:
+            change()
+
+    def delete_task(self, task_id: int) -> None:
+        """Deletes the task with the given ID from the store."""
+        task = self.task_store.get(task_id)
+        change = partial(self.task_store.delete, task_id)
+        if self.displays(task):
+            self._remove_row(task, change)
+        else:
+            change()
+
+
+class TaskCommand(DeltaCommand):
+    """An edit to the tasks in the agenda which can be undone.
+
+    Subclasses implement redo and undo to make and reverse the change. A
+    change to a single task only signals its row to the view, while a change
+    to many tasks displays the tasks again once.
+
+    Attributes:
+        saver: Saves changes to the tasks in the background.
+        task_model: Table model which displays the tasks in the agenda.
+        task_store: Store of all tasks in the agenda.
+    """
+
+    def __init__(
+        self, text: str, size: int, task_model: TaskTableModel, saver: WriteBehindSaver
+    ) -> None:
+        super().__init__(text, size)
+        self.saver = saver
+        self.task_model = task_model
+        self.task_store = task_model.task_store
+
+    def change(self, change, *args) -> None:
+        """Makes a change to the displayed tasks and schedules it to be saved.
+
+        Args:
+            change: Method of the table model which makes the change.
+            args: Arguments of the change.
+        """
+        with timed("agenda.render"):
+            change(*args)
+        self.saver.mark_dirty()
+
+
+class AddTaskCommand(TaskCommand):
+    """Adds a task, holding the task to remove it again."""
+
+    def __init__(
+        self, task_model: TaskTableModel, saver: WriteBehindSaver, task: Task
+    ) -> None:
+        super().__init__("Add Task", 1, task_model, saver)
+        self.task = task
+
+    def redo(self) -> None:
+        self.change(self.task_model.add_task, self.task)
+
+    def undo(self) -> None:
+        self.change(self.task_model.delete_task, self.task.task_id)
+
+
+class SetCompletedCommand(TaskCommand):
+    """Marks tasks as complete/incomplete, holding the IDs of changed tasks."""
+
+    def __init__(
+        self,
+        task_model: TaskTableModel,
+        saver: WriteBehindSaver,
+        task_ids: list,
+        completed: bool,
+    ) -> None:
+        task_store = task_model.task_store
+        task_ids = [
+            task_id
+            for task_id in dict.fromkeys(task_ids)
+            if task_store.get(task_id).completed != completed
+        ]
+        text = "Mark as Complete" if completed else "Mark as Incomplete"
+        super().__init__(text, len(task_ids), task_model, saver)
+        self.completed = completed
+        self.task_ids = task_ids
+
+    def redo(self) -> None:
+        self.change(self._set_completed, self.completed)
+
+    def undo(self) -> None:
+        self.change(self._set_completed, not self.completed)
+
+    def _set_completed(self, completed: bool) -> None:
+        """Marks the tasks as complete/incomplete."""
+        if len(self.task_ids) == 1:
+            self.task_model.set_completed(self.task_ids[0], completed)
+        else:
+            self.task_model.change_tasks(
+                partial(self.task_store.set_completed_all, self.task_ids, completed)
+            )
+
+
+class DeleteTasksCommand(TaskCommand):
+    """Deletes tasks, holding the deleted tasks to add them back."""
+
+    def __init__(
+        self, task_model: TaskTableModel, saver: WriteBehindSaver, task_ids: list
+    ) -> None:
+        task_store = task_model.task_store
+        task_list = [task_store.get(task_id) for task_id in dict.fromkeys(task_ids)]
+        super().__init__("Delete Task", len(task_list), task_model, saver)
+        self.task_list = task_list
+
+    def redo(self) -> None:
+        if len(self.task_list) == 1:
+            self.change(self.task_model.delete_task, self.task_list[0].task_id)
+        else:
+            task_ids = [task.task_id for task in self.task_list]
+            self.change(
+                self.task_model.change_tasks,
+                partial(self.task_store.delete_all, task_ids),
+            )
+
+    def undo(self) -> None:
+        if len(self.task_list) == 1:
+            self.change(self.task_model.add_task, self.task_list[0])
+        else:
+            self.change(
+                self.task_model.change_tasks,
+                partial(self.task_store.add_all, self.task_list),
+            )
+
+
+class ChangeSubjectCommand(TaskCommand):
+    """Changes the subject of tasks, holding their IDs by their old subjects."""
+
+    def __init__(
+        self,
+        task_model: TaskTableModel,
+        saver: WriteBehindSaver,
+        task_ids: list,
+        subject: str,
+    ) -> None:
+        task_store = task_model.task_store
+        old_subjects = {}
+        for task_id in dict.fromkeys(task_ids):
+            old_subject = task_store.get(task_id).subject
+            if old_subject != subject:
+                old_subjects.setdefault(old_subject, []).append(task_id)
+        size = sum(len(old_task_ids) for old_task_ids in old_subjects.values())
+        super().__init__("Change Subject", size, task_model, saver)
+        self.old_subjects = old_subjects
+        self.subject = subject
+
+    def redo(self) -> None:
+        self.change(self.task_model.change_tasks, self._set_new_subject)
+
+    def undo(self) -> None:
+        self.change(self.task_model.change_tasks, self._set_old_subjects)
+
+    def _set_new_subject(self) -> None:
+        """Sets the new subject of the tasks."""
+        for task_ids in self.old_subjects.values():
+            self.task_store.set_subject_all(task_ids, self.subject)
+
+    def _set_old_subjects(self) -> None:
+        """Sets the subjects which the tasks had before."""
+        for old_subject, task_ids in self.old_subjects.items():
+            self.task_store.set_subject_all(task_ids, old_subject)
+
+
 class AgendaWindow(QMainWindow, Ui_mwindow_agenda):
     """Sets up the Agenda main window.
 
+    Creating the window takes the lock on the tasks, and raises LockedError if
+    it cannot be taken.
+
     Attributes:
         Dialog: Dialog window object for adding a new task.
         hidden_tasks: Completed tasks (may be hidden by the user).
-        task_list: List of all tasks.
-        task_list_hidden: List of tasks with completed tasks hidden.
+        history_dialog: Dialog window which displays the archived tasks.
+        subject_dialog: Dialog window for changing the subject of tasks.
+        remaining_task_chunks: Chunks of tasks which are still to be read.
+        saver: Saves changes to the tasks in the background.
+        task_model: Table model which displays the tasks in the agenda.
+        task_store: Store of all tasks in the agenda.
+        undo_stack: Edits to the tasks which can be undone.
     """
 
     def __init__(self) -> None:
+        lock_agenda_tasks()
         # Hides completed tasks by default.
         self.Dialog = AddTaskDialog()
+        self.Dialog.comb_box_subject.setModel(subject_model())
         self.hidden_tasks = True
-        self.task_list, self.task_list_hidden = read_tasks()
+        self.history_dialog = None
+        self.subject_dialog = ChangeSubjectDialog()
+        self.subject_dialog.comb_box_subject.setModel(subject_model())
+        self.task_store, self.remaining_task_chunks = open_task_store_in_chunks()
+        self.task_model = TaskTableModel(self.task_store)
+        self.saver = WriteBehindSaver(self.task_store.snapshot, "agenda.save")
         super().__init__()
         self.setupUi(self)
+        self.undo_stack = UndoStack(self)
+        self.undo_stack.add_actions(self)
         self.setStyleSheet(
-            """QTableWidget {background-color: transparent;}
+            """QTableView {background-color: transparent;}
             QHeaderView::section {background-color: transparent;}
             QHeaderView {background-color: transparent;}
             QTableCornerButton::section{background-color: transparent;}"""
         )
         self.btn_add_task.clicked.connect(self.open_dialog_add_task)
         self.btn_complete_task.clicked.connect(self.mark_task_complete)
+        self.btn_uncomplete_task.clicked.connect(self.mark_task_incomplete)
+        self.btn_change_subject.clicked.connect(self.open_dialog_change_subject)
         self.btn_delete_task.clicked.connect(self.delete_task)
         self.btn_hide_completed.clicked.connect(self.hide_completed_tasks)
         self.btn_hide_completed.setText("Show Completed Tasks")
-        self.update_list()
+        self.btn_show_history.clicked.connect(self.open_dialog_task_history)
+
+        # Offers views of the tasks by due date, with the dates of the custom
+        # range only shown when it is chosen.
+        self.comb_box_view.addItems(DUE_DATE_VIEWS)
+        self.comb_box_view.currentIndexChanged.connect(self.search_tasks)
+        today = QDate.currentDate()
+        self.date_edit_first.setDate(today)
+        self.date_edit_last.setDate(today.addDays(6))
+        self.date_edit_first.dateChanged.connect(self.search_tasks)
+        self.date_edit_last.dateChanged.connect(self.search_tasks)
+        self.date_edit_first.setVisible(False)
+        self.date_edit_last.setVisible(False)
+
+        # Searches the tasks as the user types or chooses a subject.
+        self.comb_box_filter_subject.setModel(subject_model())
+        self.comb_box_filter_subject.setCurrentIndex(-1)
+        self.line_edit_search.textChanged.connect(self.search_tasks)
+        self.comb_box_filter_subject.currentIndexChanged.connect(self.search_tasks)
+        self.btn_clear_search.clicked.connect(self.clear_search)
+
+        # Displays the tasks in a table in order of due date, resizing to fit
+        # content. Clicking a column header sorts the tasks by that column.
+        self.table_view_task_list.horizontalHeader().setSortIndicator(
+            DUE_DATE_COLUMN, Qt.AscendingOrder
+        )
+        with timed("agenda.render"):
+            self.table_view_task_list.setModel(self.task_model)
+            self.table_view_task_list.horizontalHeader().setSectionResizeMode(
+                QtWidgets.QHeaderView.ResizeToContents
+            )
+            self.table_view_task_list.verticalHeader().setSectionResizeMode(
+                QtWidgets.QHeaderView.Fixed
+            )
+
+        # Reads the rest of the tasks while the event loop is idle. The tasks
+        # cannot be changed until they have all been read, as a new task could
+        # otherwise be given the ID of a task which has not been read yet.
+        if self.remaining_task_chunks is not None:
+            self.set_editing_enabled(False)
+            QTimer.singleShot(0, self.load_remaining_tasks)
+        else:
+            self.finish_loading()
+
+    def load_remaining_tasks(self) -> None:
+        """Reads the next chunk of tasks and adds them to the agenda."""
+        with timed("agenda.load"):
+            task_list = next(self.remaining_task_chunks, None)
+        if task_list is None:
+            self.remaining_task_chunks = None
+            self.task_store.loading = False
+            logger.debug("Read %d tasks", len(self.task_store))
+            self.set_editing_enabled(True)
+            self.finish_loading()
+            return
+        with timed("agenda.render"):
+            self.task_model.add_loaded_tasks(task_list)
+        QTimer.singleShot(0, self.load_remaining_tasks)
+
+    def set_editing_enabled(self, enabled: bool) -> None:
+        """Enables/disables the buttons which change the tasks.
+
+        Sorting is also disabled, so that the tasks are not sorted again as
+        each chunk is read.
+        """
+        self.table_view_task_list.setSortingEnabled(enabled)
+        for button in (
+            self.btn_add_task,
+            self.btn_complete_task,
+            self.btn_uncomplete_task,
+            self.btn_change_subject,
+            self.btn_delete_task,
+        ):
+            button.setEnabled(enabled)
+
+    def finish_loading(self) -> None:
+        """Saves and archives the tasks once they have all been read.
+
+        Tasks which were given new IDs as they were read are saved with them
+        straight away, and old completed tasks are moved into the archive.
+        """
+        if self.task_store.compaction_needed:
+            self.saver.mark_dirty()
+        self.archive_old_tasks()
+
+    def archive_old_tasks(self) -> None:
+        """Moves old completed tasks into the archive once all are read.
+
+        The tasks are only displayed again if any are archived, so that the
+        selection and scroll position are otherwise kept.
+        """
+        task_list = old_completed_tasks(self.task_store)
+        if not task_list:
+            return
+        self.task_model.change_tasks(
+            partial(archive_completed_tasks, self.task_store, task_list)
+        )
+        # Edits to the archived tasks can no longer be undone.
+        self.undo_stack.clear()
+        self.saver.mark_dirty()
+
+    def open_dialog_task_history(self) -> None:
+        """Opens the dialog which displays the archived tasks."""
+        self.history_dialog = TaskHistoryDialog()
+        self.history_dialog.open()
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Finishes saving any changes when the window is closed."""
+        self.saver.flush()
+        super().closeEvent(event)
 
     def open_dialog_add_task(self) -> None:
         """Opens the dialog for the user to add a task."""
         self.Dialog.button_box_new_task.accepted.disconnect()
         self.Dialog.button_box_new_task.accepted.connect(self.save_task)
-
-        # Populates the combo box with subject options.
-        self.Dialog.comb_box_subject.clear()
-        with open("resources/subject_list.txt", "r") as data_file:
-            subject_list = data_file.readlines()
-            for line in subject_list:
-                self.Dialog.comb_box_subject.addItem(line.strip("\n"))
         self.Dialog.open()
 
-    def update_list(self) -> None:
-        """Populates the agenda with all tasks."""
-        # Displays completed tasks if user selected the option.
-        if self.hidden_tasks is True:
-            current_list = self.task_list_hidden
-        else:
-            current_list = self.task_list
-
-        # Creates table to display tasks, resizing to fit content.
-        self.table_widget_task_list.setRowCount(len(current_list))
-        self.table_widget_task_list.horizontalHeader().setSectionResizeMode(
-            QtWidgets.QHeaderView.ResizeToContents
-        )
-        self.table_widget_task_list.verticalHeader().setSectionResizeMode(
-            QtWidgets.QHeaderView.Fixed
-        )
-
-        # Adds tasks to the agenda.
-        self.sort_task_list()
-        current_row = 0
-        for task in current_list:
-            current_column = 0
-            for task_details in task.values():
-                self.table_widget_task_list.setItem(
-                    current_row,
-                    current_column,
-                    QtWidgets.QTableWidgetItem(task_details),
-                )
-                current_column += 1
-            current_row += 1
-
     def save_task(self) -> None:
         """Saves new tasks to the agenda and JSON file."""
         new_subject = self.Dialog.comb_box_subject.currentText()
-        new_due_date = self.Dialog.calendar_due_date.selectedDate().toString(
-            "dd/MM/yyyy"
+        new_due_date = (
+            self.Dialog.calendar_due_date.selectedDate().toPyDate().toordinal()
         )
-        new_completed = "No"
 
         # Validates task title input and adds task if validation passed.
         new_task_title = self.Dialog.line_edit_task_title.text()
         if len(new_task_title) <= 30 and len(new_task_title.strip(" ")) > 0:
-            task = {
-                "task_title": new_task_title,
-                "subject": new_subject,
-                "due_date": new_due_date,
-                "completed": new_completed,
-            }
-            self.task_list.append(dict(task))
-            self.save_task_list()
+            task = self.task_store.new_task(new_task_title, new_subject, new_due_date)
+            self.undo_stack.push(AddTaskCommand(self.task_model, self.saver, task))
             self.Dialog.close()
-            self.update_list()
         elif len(new_task_title.strip(" ")) == 0:
             self.Dialog.lbl_instruction.setText(
                 "You have not entered a task title. Please try again."
@@ -163,24 +744,6 @@ class AgendaWindow(QMainWindow, Ui_mwindow_agenda):
                 "Your task title exceeds 30 characters. Please try again."
             )
 
-    def save_task_list(self) -> None:
-        """Updates the JSON file with the current task list."""
-        with open("resources/task_list.json", "w") as outfile:
-            json.dump(self.task_list, outfile, ensure_ascii=False, indent=4)
-
-        self.task_list_hidden[:] = [
-            task for task in self.task_list if task["completed"] == "No"
-        ]
-        with open("resources/task_list_hidden.json", "w") as outfile:
-            json.dump(self.task_list_hidden, outfile, ensure_ascii=False, indent=4)
-
-    def sort_task_list(self) -> None:
-        """Sorts task list by due date."""
-        self.task_list.sort(
-            key=lambda task: datetime.strptime(task["due_date"], "%d/%m/%Y")
-        )
-        self.save_task_list()
-
     def hide_completed_tasks(self) -> None:
         """Hides/shows completed tasks."""
         if self.hidden_tasks is False:
@@ -189,50 +752,98 @@ class AgendaWindow(QMainWindow, Ui_mwindow_agenda):
         else:
             self.hidden_tasks = False
             self.btn_hide_completed.setText("Hide Completed Tasks")
-        self.update_list()
+        with timed("agenda.render"):
+            self.task_model.set_show_completed(not self.hidden_tasks)
+
+    def search_tasks(self) -> None:
+        """Displays only the tasks in the chosen view which match the search."""
+        view = self.comb_box_view.currentText()
+        custom_range = (
+            self.date_edit_first.date().toPyDate().toordinal(),
+            self.date_edit_last.date().toPyDate().toordinal(),
+        )
+        self.date_edit_first.setVisible(view == "Custom Range")
+        self.date_edit_last.setVisible(view == "Custom Range")
+        today = QDate.currentDate().toPyDate().toordinal()
+
+        subject = None
+        if self.comb_box_filter_subject.currentIndex() >= 0:
+            subject = self.comb_box_filter_subject.currentText()
+        query = replace(
+            due_date_view(view, today, custom_range),
+            text=self.line_edit_search.text().strip(),
+            subject=subject,
+        )
+        if query == TaskQuery():
+            query = None
+        with timed("agenda.search"):
+            self.task_model.set_query(query)
+
+    def clear_search(self) -> None:
+        """Clears the search box and subject, keeping the view by due date."""
+        for widget in (self.line_edit_search, self.comb_box_filter_subject):
+            widget.blockSignals(True)
+        self.line_edit_search.clear()
+        self.comb_box_filter_subject.setCurrentIndex(-1)
+        for widget in (self.line_edit_search, self.comb_box_filter_subject):
+            widget.blockSignals(False)
+        self.search_tasks()
+
+    def selected_task_ids(self) -> list:
+        """Gets the IDs of the tasks in the selected rows."""
+        return [
+            index.data(Qt.UserRole)
+            for index in self.table_view_task_list.selectionModel().selectedRows()
+        ]
 
     def mark_task_complete(self) -> None:
-        """Marks selected task as complete/incomplete."""
-        selected_row = self.table_widget_task_list.currentRow()
-        if self.table_widget_task_list.item(selected_row, 3).text() == "No":
-            self.table_widget_task_list.item(selected_row, 3).setText("Yes")
-        else:
-            self.table_widget_task_list.item(selected_row, 3).setText("No")
-
-        selected_task_title = self.table_widget_task_list.item(selected_row, 0).text()
-        selected_subject = self.table_widget_task_list.item(selected_row, 1).text()
-        selected_due_date = self.table_widget_task_list.item(selected_row, 2).text()
-
-        # Iterates through task list for matching task and updates completion.
-        for num, task in enumerate(self.task_list):
-            if (
-                task["task_title"] == selected_task_title
-                and task["subject"] == selected_subject
-                and task["due_date"] == selected_due_date
-            ):
-                self.task_list[num]["completed"] = self.table_widget_task_list.item(
-                    selected_row, 3
-                ).text()
-        self.save_task_list()
-        self.update_list()
+        """Marks the selected tasks as complete."""
+        self.set_selected_completed(True)
+
+    def mark_task_incomplete(self) -> None:
+        """Marks the selected tasks as incomplete."""
+        self.set_selected_completed(False)
+
+    def set_selected_completed(self, completed: bool) -> None:
+        """Marks the selected tasks as complete/incomplete.
+
+        Many selected tasks are changed together, and then displayed again
+        and saved once, rather than once for each task.
+        """
+        command = SetCompletedCommand(
+            self.task_model, self.saver, self.selected_task_ids(), completed
+        )
+        if command.size:
+            self.undo_stack.push(command)
 
     def delete_task(self) -> None:
-        """Deletes selected task from agenda."""
-        selected_row = self.table_widget_task_list.currentRow()
-        selected_task_title = self.table_widget_task_list.item(selected_row, 0).text()
-        selected_subject = self.table_widget_task_list.item(selected_row, 1).text()
-        selected_due_date = self.table_widget_task_list.item(selected_row, 2).text()
-
-        # Iterates through task list and deletes matching task.
-        for task in self.task_list:
-            if (
-                task["task_title"] == selected_task_title
-                and task["subject"] == selected_subject
-                and task["due_date"] == selected_due_date
-            ):
-                self.task_list.remove(task)
-        self.save_task_list()
-        self.update_list()
+        """Deletes the selected tasks from the agenda."""
+        command = DeleteTasksCommand(
+            self.task_model, self.saver, self.selected_task_ids()
+        )
+        if command.size:
+            self.undo_stack.push(command)
+
+    def open_dialog_change_subject(self) -> None:
+        """Opens the dialog for changing the subject of the selected tasks."""
+        if not self.selected_task_ids():
+            return
+        self.subject_dialog.button_box_change_subject.accepted.disconnect()
+        self.subject_dialog.button_box_change_subject.accepted.connect(
+            self.change_subject
+        )
+        self.subject_dialog.open()
+
+    def change_subject(self) -> None:
+        """Changes the subject of the selected tasks to the chosen subject."""
+        subject = self.subject_dialog.comb_box_subject.currentText()
+        if subject:
+            command = ChangeSubjectCommand(
+                self.task_model, self.saver, self.selected_task_ids(), subject
+            )
+            if command.size:
+                self.undo_stack.push(command)
+        self.subject_dialog.close()
 
 
 if __name__ == "__main__":
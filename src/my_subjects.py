@@ -1,15 +1,31 @@
-"""A subject list which enables students to add subjects to dropdown menus."""
+"""A subject list which enables students to add subjects to dropdown menus.
 
+The subjects are read once into a list model shared by every window, so that
+the dropdown menus are kept up to date without reading the subject list again.
+"""
+
+import logging
 import sys
 
 from PyQt5 import QtWidgets
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt5.QtGui import QCloseEvent
 from PyQt5.QtWidgets import QDialog, QMainWindow
 
+from persistence import WriteBehindSaver
+from planner.core.instrumentation import configure_logging, timed
+from planner.core.subjects import open_subject_list
 from setup.add_subject_setup import Ui_dialog_new_subject
 from setup.my_subjects_setup import Ui_mwindow_my_subjects
+from undo import DeltaCommand, UndoStack
+
+logger = logging.getLogger(__name__)
+
+_subject_model = None
 
 
 def main() -> None:
+    configure_logging()
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle("fusion")
     mwindow_my_subjects = MySubjectsWindow()
@@ -25,11 +41,98 @@ class AddSubjectDialog(QDialog, Ui_dialog_new_subject):
         self.setupUi(self)
 
 
-def sort_subject_list() -> None:
-    """Sorts the subject list text file alphanumerically."""
-    with open("resources/subject_list.txt", "r+") as outfile:
-        lines = outfile.readlines()
-        lines.sort()
+def subject_model() -> "SubjectListModel":
+    """Gets the list of subjects shared by all windows, reading it once."""
+    global _subject_model
+    if _subject_model is None:
+        _subject_model = SubjectListModel()
+    return _subject_model
+
+
+class SubjectListModel(QAbstractListModel):
+    """Displays the list of subjects which is shared by all windows.
+
+    The subject combo boxes in the Agenda and Timetable dialogs and the list
+    in My Subjects all display this model, so a subject which is added or
+    deleted appears everywhere without reading the subject list again.
+    Changes are saved in the background once edits have paused.
+
+    Attributes:
+        saver: Saves changes to the subject list in the background.
+        subjects: Sorted list of the names of all subjects.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.subjects = open_subject_list()
+        self.saver = WriteBehindSaver(self.subjects.snapshot, "subjects.save")
+        logger.debug("Read %d subjects", len(self.subjects))
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.subjects)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        return self.subjects[index.row()]
+
+    def add_subject(self, subject: str) -> bool:
+        """Adds a subject to the list in alphanumerical order and saves it.
+
+        Args:
+            subject: Name of the subject to add.
+
+        Returns:
+            Whether the subject was added, as it was not already in the list.
+        """
+        if subject in self.subjects:
+            return False
+
+        row = self.subjects.row(subject)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.subjects.add(subject)
+        self.endInsertRows()
+        self.saver.mark_dirty()
+        return True
+
+    def delete_subject(self, row: int) -> None:
+        """Deletes the subject in the given row from the list and saves it."""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.subjects.delete(row)
+        self.endRemoveRows()
+        self.saver.mark_dirty()
+
+
+class AddSubjectCommand(DeltaCommand):
+    """Adds a subject, holding its name to delete it again."""
+
+    def __init__(self, subject: str) -> None:
+        super().__init__("Add Subject", 1)
+        self.subject = subject
+
+    def redo(self) -> None:
+        subject_model().add_subject(self.subject)
+
+    def undo(self) -> None:
+        subject_model().delete_subject(subject_model().subjects.row(self.subject))
+
+
+class DeleteSubjectsCommand(DeltaCommand):
+    """Deletes subjects, holding their names to add them back."""
+
+    def __init__(self, subjects: list) -> None:
+        super().__init__("Delete Subject", len(subjects))
+        self.subjects = subjects
+
+    def redo(self) -> None:
+        for subject in self.subjects:
+            subject_model().delete_subject(subject_model().subjects.row(subject))
+
+    def undo(self) -> None:
+        for subject in self.subjects:
+            subject_model().add_subject(subject)
 
 
 class MySubjectsWindow(QMainWindow, Ui_mwindow_my_subjects):
@@ -37,25 +140,27 @@ class MySubjectsWindow(QMainWindow, Ui_mwindow_my_subjects):
 
     Attributes:
         Dialog: Dialog window for adding new subjects.
+        undo_stack: Edits to the subject list which can be undone.
     """
 
     def __init__(self) -> None:
         super().__init__()
         self.Dialog = AddSubjectDialog()
         self.setupUi(self)
+        self.undo_stack = UndoStack(self)
+        self.undo_stack.add_actions(self)
 
         self.btn_add_subject.clicked.connect(self.open_dialog_add_subject)
         self.btn_delete_subject.clicked.connect(self.delete_subject)
 
-        # Populates the list widget on window startup.
-        with open("resources/subject_list.txt", "r") as data_file:
-            subject_list = data_file.readlines()
-            print(subject_list)
-            print(len(subject_list))
-            for line in subject_list:
-                self.list_widget_my_subjects.addItem(line.strip("\n"))
-            self.list_widget_my_subjects.sortItems()
-            sort_subject_list()
+        # Displays the subject list shared with the other windows.
+        with timed("subjects.render"):
+            self.list_view_my_subjects.setModel(subject_model())
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Finishes saving any changes when the window is closed."""
+        subject_model().saver.flush()
+        super().closeEvent(event)
 
     def open_dialog_add_subject(self) -> None:
         """Opens the dialog window for the user to add a subject."""
@@ -65,31 +170,24 @@ class MySubjectsWindow(QMainWindow, Ui_mwindow_my_subjects):
 
     def delete_subject(self) -> None:
         """Deletes the selected subject."""
-        selected_item = self.list_widget_my_subjects.selectedItems()
-        for item in selected_item:
-            self.list_widget_my_subjects.takeItem(
-                self.list_widget_my_subjects.row(item)
-            )
-        self.save_subject_list()
-
-    def save_subject_list(self) -> None:
-        """Saves the subject list."""
-        with open("resources/subject_list.txt", "w") as outfile:
-            for i in range(self.list_widget_my_subjects.count()):
-                subject = self.list_widget_my_subjects.item(i).text()
-                outfile.write(subject + "\n")
+        selected_subjects = [
+            index.data() for index in self.list_view_my_subjects.selectedIndexes()
+        ]
+        if selected_subjects:
+            self.undo_stack.push(DeleteSubjectsCommand(selected_subjects))
 
     def save_subject(self) -> None:
-        """Saves input to a .txt file for the list of subjects."""
+        """Saves input to the list of subjects."""
         new_subject_name = self.Dialog.line_edit_subject_name.text()
         if len(new_subject_name) <= 30 and len(new_subject_name.strip(" ")) > 0:
-            print(new_subject_name)
-            self.list_widget_my_subjects.addItem(new_subject_name)
-            self.list_widget_my_subjects.sortItems()
-            with open("resources/subject_list.txt", "a") as outfile:
-                outfile.write(new_subject_name + "\n")
-            sort_subject_list()
-            self.Dialog.close()
+            logger.debug("Adding subject %r", new_subject_name)
+            if new_subject_name not in subject_model().subjects:
+                self.undo_stack.push(AddSubjectCommand(new_subject_name))
+                self.Dialog.close()
+            else:
+                self.Dialog.lbl_instruction.setText(
+                    "You have already added this subject. Please try again."
+                )
         elif len(new_subject_name.strip(" ")) == 0:
             self.Dialog.lbl_instruction.setText(
                 "You have not entered a subject name. Please try again."
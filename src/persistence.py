@@ -0,0 +1,139 @@
+"""Saving of the data of the student planner from the user interface.
+
+Edits are saved by a write-behind saver, which waits until a burst of edits
+has finished and then saves them all at once on a background thread, so that
+the user interface does not wait for the disk. If a save fails, the user is
+warned and the edits are kept to be saved again.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PyQt5.QtCore import QCoreApplication, QEvent, QObject, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QMessageBox
+
+from planner.core.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+# Saves are run one at a time, in the order that they were started.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="saver")
+_savers = []
+
+# Milliseconds to wait before saving the changes again after a save fails.
+RETRY_DELAY_MS = 30_000
+
+
+def flush_all() -> None:
+    """Saves the pending changes of every saver and waits for them to finish."""
+    for saver in _savers:
+        saver.flush()
+
+
+class WriteBehindSaver(QObject):
+    """Saves changes on a background thread once edits have paused.
+
+    Each edit marks the saver as dirty and restarts a short timer, so a burst
+    of edits is coalesced into a single save. When the timer fires, the
+    snapshot function is called on the GUI thread to capture the data to be
+    saved, and the function which it returns writes that data on a background
+    thread.
+
+    If the write fails, the captured changes are restored, so that they are
+    saved again after RETRY_DELAY_MS or with the next edit, and the user is
+    warned that they have not been saved yet.
+
+    Attributes:
+        operation: Name of the save operation, used to time it.
+    """
+
+    # Signals a failed write from the background thread, with its restore
+    # function and the error.
+    _write_failed = pyqtSignal(object, object)
+
+    def __init__(self, snapshot, operation: str, delay_ms: int = 300) -> None:
+        """Creates a saver.
+
+        Args:
+            snapshot: Function which captures the changes to save and returns
+                      a function which writes them and a function which
+                      restores them if the write fails.
+            operation: Name of the save operation, such as "agenda.save".
+            delay_ms: Milliseconds to wait after an edit before saving.
+        """
+        super().__init__()
+        self.operation = operation
+        self._snapshot = snapshot
+        self._delay_ms = delay_ms
+        self._dirty = False
+        self._futures = []
+        self._message_box = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.save_in_background)
+        self._write_failed.connect(self._restore)
+
+        # Saves any pending changes before the application quits.
+        if not _savers and QCoreApplication.instance() is not None:
+            QCoreApplication.instance().aboutToQuit.connect(flush_all)
+        _savers.append(self)
+
+    def mark_dirty(self) -> None:
+        """Schedules the changes to be saved once edits have paused."""
+        self._dirty = True
+        self._timer.start(self._delay_ms)
+
+    def save_in_background(self) -> None:
+        """Starts saving the changes on the background thread."""
+        self._timer.stop()
+        if not self._dirty:
+            return
+        self._dirty = False
+        write, restore = self._snapshot()
+        self._futures = [future for future in self._futures if not future.done()]
+        future = _executor.submit(self._write, write, restore)
+        self._futures.append(future)
+
+    def flush(self) -> None:
+        """Saves any pending changes and waits for all saves to finish."""
+        self.save_in_background()
+        wait(self._futures)
+        self._futures.clear()
+        # Restores the changes of any failed write before returning.
+        QCoreApplication.sendPostedEvents(self, QEvent.MetaCall)
+
+    def _write(self, write, restore) -> None:
+        """Runs a write on the background thread, signalling any error."""
+        try:
+            with timed(self.operation):
+                write()
+        except Exception as error:
+            logger.exception("Failed to save (%s)", self.operation)
+            self._write_failed.emit(restore, error)
+
+    @pyqtSlot(object, object)
+    def _restore(self, restore, error: Exception) -> None:
+        """Keeps the changes of a failed write to be saved again.
+
+        Args:
+            restore: Function which restores the changes captured for the
+                     write.
+            error: The error which the write failed with.
+        """
+        restore()
+        self._dirty = True
+        if not self._timer.isActive():
+            self._timer.start(RETRY_DELAY_MS)
+
+        if self._message_box is None:
+            self._message_box = QMessageBox(
+                QMessageBox.Warning,
+                "Student Planner",
+                "",
+                QMessageBox.Ok,
+            )
+        self._message_box.setText(
+            "Your changes could not be saved, so they will be saved again "
+            f"later.\n\n{error}"
+        )
+        self._message_box.show()
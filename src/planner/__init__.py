@@ -0,0 +1 @@
+"""The student planner, whose logic is kept separate from its user interface."""
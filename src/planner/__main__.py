@@ -0,0 +1,8 @@
+"""Runs the command line interface of the student planner."""
+
+import sys
+
+from planner.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""The command line interface of the student planner, for bulk task operations.
+
+Tasks can be added, completed, deleted, listed, imported, and exported without
+opening the agenda. The same files (or SQLite database) as the agenda are
+used, so the commands must be run from the src folder, for example:
+
+    python -m planner add "Essay" --subject English --due 2021-06-29
+    python -m planner complete 3 7
+    python -m planner list --due-before 2021-07-01
+    python -m planner import cohort_tasks.json
+
+The batch command reads one command per line from standard input, and applies
+them all with one write, so that thousands of tasks can be added at once. If
+any command fails, none of them are saved.
+
+    python -m planner batch < operations.txt
+
+Commands cannot be run while the agenda is open in the student planner, which
+holds the lock on the tasks until it exits.
+"""
+
+import argparse
+import io
+import shlex
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+
+from planner.core import serializer
+from planner.core.instrumentation import configure_logging
+from planner.core.records import format_due_date, parse_due_date
+from planner.core.storage import (
+    CLI_HOLDER,
+    LockedError,
+    lock_tasks,
+    write_atomically,
+)
+from planner.core.tasks import open_task_store
+
+# The longest task title which can be entered in the agenda.
+MAX_TASK_TITLE_LENGTH = 30
+
+
+class CommandError(Exception):
+    """A command could not be applied to the tasks."""
+
+
+class CommandParser(argparse.ArgumentParser):
+    """Parses commands, raising CommandError rather than exiting on errors."""
+
+    def error(self, message: str) -> None:
+        raise CommandError(message)
+
+
+def due_date(text: str) -> int:
+    """Parses a due date given on the command line into a date ordinal."""
+    try:
+        return parse_due_date(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid date {text!r}, expected yyyy-mm-dd or dd/mm/yyyy"
+        )
+
+
+def check_task_title(task_title: str) -> None:
+    """Checks a task title in the same way as the Add Task dialog.
+
+    Raises:
+        CommandError: The title is blank or too long.
+    """
+    if len(task_title.strip(" ")) == 0:
+        raise CommandError("the task title is blank")
+    if len(task_title) > MAX_TASK_TITLE_LENGTH:
+        raise CommandError(
+            f"the task title {task_title!r} exceeds "
+            f"{MAX_TASK_TITLE_LENGTH} characters"
+        )
+
+
+def check_task_ids(task_store, task_ids: list) -> None:
+    """Checks that there is a task with each ID.
+
+    Raises:
+        CommandError: A task does not exist.
+    """
+    for task_id in task_ids:
+        try:
+            task_store.get(task_id)
+        except KeyError:
+            raise CommandError(f"there is no task with ID {task_id}")
+
+
+def add_task(task_store, args) -> None:
+    """Adds a task and prints its ID."""
+    check_task_title(args.task_title)
+    task = task_store.new_task(args.task_title, args.subject, args.due)
+    task_store.add(task)
+    print(task.task_id)
+
+
+def complete_tasks(task_store, args) -> None:
+    """Marks tasks as complete."""
+    check_task_ids(task_store, args.task_ids)
+    task_store.set_completed_all(args.task_ids, True)
+
+
+def uncomplete_tasks(task_store, args) -> None:
+    """Marks tasks as incomplete."""
+    check_task_ids(task_store, args.task_ids)
+    task_store.set_completed_all(args.task_ids, False)
+
+
+def delete_tasks(task_store, args) -> None:
+    """Deletes tasks."""
+    check_task_ids(task_store, args.task_ids)
+    task_store.delete_all(args.task_ids)
+
+
+def list_tasks(task_store, args) -> None:
+    """Prints the tasks in order of due date, one per line.
+
+    The ID, due date, completion status, subject, and title of each task are
+    separated by tabs, so that the list can be read by other programs.
+    """
+    if args.due_before is None:
+        count = task_store.count(args.all)
+    else:
+        count = task_store.count_due_before(args.due_before, args.all)
+    for row in range(count):
+        task = task_store.task_at(row, args.all)
+        print(
+            task.task_id,
+            format_due_date(task.due_date),
+            task.display("completed"),
+            task.subject,
+            task.task_title,
+            sep="\t",
+        )
+
+
+def import_tasks(task_store, args) -> None:
+    """Adds the tasks in a JSON file, giving them new IDs.
+
+    The file holds an array of tasks in the same format as the task list JSON
+    file. The tasks are added together, so that importing thousands of tasks
+    takes linear time.
+    """
+    try:
+        if args.path == "-":
+            data = serializer.loads(sys.stdin.read())
+        else:
+            data = serializer.load_file(args.path)
+    except (OSError, ValueError) as error:
+        raise CommandError(f"cannot read tasks from {args.path}: {error}")
+    if not isinstance(data, list):
+        raise CommandError(f"expected a JSON array of tasks in {args.path}")
+
+    task_list = []
+    for number, item in enumerate(data, 1):
+        try:
+            task_title = item["task_title"]
+            subject = item["subject"]
+            completed = item.get("completed", False)
+            if not (
+                isinstance(task_title, str)
+                and isinstance(subject, str)
+                and isinstance(item["due_date"], str)
+                and completed in (True, False, "Yes", "No")
+            ):
+                raise TypeError
+            new_due_date = parse_due_date(item["due_date"])
+        except (KeyError, TypeError, ValueError):
+            raise CommandError(f"task {number} in {args.path} is not a valid task")
+        check_task_title(task_title)
+        task = task_store.new_task(task_title, subject, new_due_date)
+        task.completed = completed in (True, "Yes")
+        task_list.append(task)
+    task_store.add_all(task_list)
+    print(f"Imported {len(task_list)} tasks", file=sys.stderr)
+
+
+def export_tasks(task_store, args) -> None:
+    """Writes all tasks to a JSON file in order of due date."""
+    data = [
+        task_store.task_at(row, True).to_json() for row in range(task_store.count(True))
+    ]
+    contents = serializer.dumps(data, args.pretty)
+    if args.path == "-":
+        print(contents)
+    else:
+        write_atomically(args.path, contents)
+
+
+def run_batch(task_store, args) -> None:
+    """Applies a command from each line of standard input.
+
+    Blank lines and lines starting with # are skipped.
+
+    Raises:
+        CommandError: A command failed, with the number of its line.
+    """
+    parser = build_parser()
+    for number, line in enumerate(sys.stdin, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            command = parser.parse_args(shlex.split(line))
+            if command.apply is run_batch:
+                raise CommandError("batches cannot be nested")
+            command.apply(task_store, command)
+        except (CommandError, ValueError) as error:
+            raise CommandError(f"line {number}: {error}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the parser of the commands."""
+    parser = CommandParser(
+        prog="student-planner",
+        description="Adds, completes, deletes, lists, imports, and exports the "
+        "tasks in the agenda of the student planner.",
+    )
+    commands = parser.add_subparsers(
+        dest="command", metavar="command", parser_class=CommandParser
+    )
+    commands.required = True
+
+    add_parser = commands.add_parser("add", help="add a task and print its ID")
+    add_parser.add_argument("task_title", help="title of the task")
+    add_parser.add_argument("--subject", required=True, help="subject of the task")
+    add_parser.add_argument(
+        "--due", required=True, type=due_date, help="due date (yyyy-mm-dd)"
+    )
+    add_parser.set_defaults(apply=add_task)
+
+    for name, apply, action in (
+        ("complete", complete_tasks, "mark tasks as complete"),
+        ("uncomplete", uncomplete_tasks, "mark tasks as incomplete"),
+        ("delete", delete_tasks, "delete tasks"),
+    ):
+        task_parser = commands.add_parser(name, help=action)
+        task_parser.add_argument(
+            "task_ids", nargs="+", type=int, metavar="id", help="ID of a task"
+        )
+        task_parser.set_defaults(apply=apply)
+
+    list_parser = commands.add_parser("list", help="list tasks by due date")
+    list_parser.add_argument(
+        "--due-before",
+        type=due_date,
+        metavar="DATE",
+        help="only list tasks due before this date (yyyy-mm-dd)",
+    )
+    list_parser.add_argument(
+        "--all", action="store_true", help="also list completed tasks"
+    )
+    list_parser.set_defaults(apply=list_tasks)
+
+    import_parser = commands.add_parser("import", help="add the tasks in a JSON file")
+    import_parser.add_argument("path", help="JSON file, or - for standard input")
+    import_parser.set_defaults(apply=import_tasks)
+
+    export_parser = commands.add_parser("export", help="write all tasks to a JSON file")
+    export_parser.add_argument("path", help="JSON file, or - for standard output")
+    export_parser.add_argument("--pretty", action="store_true", help="indent the JSON")
+    export_parser.set_defaults(apply=export_tasks)
+
+    batch_parser = commands.add_parser(
+        "batch", help="apply a command from each line of standard input"
+    )
+    batch_parser.set_defaults(apply=run_batch)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Runs a command, and saves the changes it made with one write.
+
+    The command is refused while the agenda is open, as both could otherwise
+    give new tasks the same IDs.
+
+    Args:
+        argv: Arguments of the command, or None to use those of the program.
+
+    Returns:
+        The exit status of the program.
+    """
+    configure_logging()
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except CommandError as error:
+        parser.print_usage(sys.stderr)
+        print(f"{parser.prog}: error: {error}", file=sys.stderr)
+        return 2
+
+    try:
+        lock_file = lock_tasks(wait=False, holder=CLI_HOLDER)
+    except LockedError as error:
+        if error.holder == CLI_HOLDER:
+            reason = "another command is changing the tasks, so try again later"
+        else:
+            reason = (
+                "the tasks are open in the agenda, so close the student planner first"
+            )
+        print(f"{parser.prog}: error: {reason}", file=sys.stderr)
+        return 1
+    except FileNotFoundError:
+        print(
+            f"{parser.prog}: error: the resources folder was not found, "
+            "so run the command from the src folder",
+            file=sys.stderr,
+        )
+        return 1
+    except OSError as error:
+        print(f"{parser.prog}: error: cannot lock the tasks: {error}", file=sys.stderr)
+        return 1
+    with lock_file:
+        return run_command(parser, args)
+
+
+def run_command(parser: argparse.ArgumentParser, args) -> int:
+    """Applies a command to the tasks while they are locked.
+
+    The output of the command is only printed once its changes are saved, so
+    that nothing is printed for a batch which fails part-way through, such as
+    the IDs of tasks which are not saved.
+
+    Returns:
+        The exit status of the program.
+    """
+    task_store = open_task_store()
+    output = io.StringIO()
+    messages = io.StringIO()
+    try:
+        with redirect_stdout(output), redirect_stderr(messages):
+            args.apply(task_store, args)
+    except CommandError as error:
+        print(f"{parser.prog}: error: {error}", file=sys.stderr)
+        return 1
+    task_store.save()
+    sys.stdout.write(output.getvalue())
+    sys.stderr.write(messages.getvalue())
+    return 0
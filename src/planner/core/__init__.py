@@ -0,0 +1,39 @@
+"""The headless core of the student planner, which does not depend on PyQt5.
+
+The core holds the tasks, subjects, and timetable, and reads and saves them,
+so that it can be used by scripts and other front ends as well as the windows
+of the student planner. For example:
+
+    from planner.core import open_task_store
+
+    task_store = open_task_store()
+    print(task_store.count(True), "tasks")
+"""
+
+import importlib
+
+# Modules which the names exported by the core are imported from. Each module
+# is only imported when one of its names is first used, so that importing the
+# core is fast and only loads what a script needs.
+_EXPORTS = {
+    "Dimensions": "timetable_grid",
+    "Lesson": "records",
+    "SubjectList": "subjects",
+    "Task": "records",
+    "TaskStore": "task_store",
+    "Timetable": "timetable_grid",
+    "open_subject_list": "subjects",
+    "open_task_store": "tasks",
+    "open_timetable": "timetable",
+    "read_subjects": "subjects",
+    "read_tasks": "tasks",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+    return getattr(module, name)
@@ -0,0 +1,333 @@
+"""An optional SQLite database for storing the data of the student planner.
+
+Tasks, subjects, and lessons are stored in indexed tables, so that an
+edit writes a single row in a transaction rather than rewriting a whole file.
+The database is used instead of the files in the resources folder when the
+STUDENT_PLANNER_BACKEND environment variable is set to "sqlite". The existing
+files are migrated into the database the first time that it is opened.
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+
+from planner.core import serializer
+from planner.core.records import Lesson, Task, format_due_date, parse_due_date
+from planner.core.task_journal import JournalReplay, read_journal
+from planner.core.timetable_file import TimetableFile
+from planner.core.timetable_grid import Dimensions, legacy_slot_key, parse_dimensions
+
+DATABASE_PATH = "resources/planner.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    task_title TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed);
+CREATE TABLE IF NOT EXISTS subjects (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS lessons (
+    week INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    teacher TEXT NOT NULL,
+    room TEXT NOT NULL,
+    PRIMARY KEY (week, day, period)
+);
+"""
+
+# Statements are kept as constants so that sqlite3 reuses the prepared
+# statement from its cache on every call.
+SELECT_TASKS = "SELECT id, task_title, subject, due_date, completed FROM tasks"
+UPSERT_TASK = (
+    "INSERT OR REPLACE INTO tasks (id, task_title, subject, due_date, completed) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+DELETE_TASK = "DELETE FROM tasks WHERE id = ?"
+SELECT_SUBJECTS = "SELECT name FROM subjects ORDER BY name"
+INSERT_SUBJECT = "INSERT OR IGNORE INTO subjects (name) VALUES (?)"
+DELETE_SUBJECT = "DELETE FROM subjects WHERE name = ?"
+SELECT_LESSONS = "SELECT week, day, period, subject, teacher, room FROM lessons"
+UPSERT_LESSON = (
+    "INSERT OR REPLACE INTO lessons (week, day, period, subject, teacher, room) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+DELETE_LESSON = "DELETE FROM lessons WHERE week = ? AND day = ? AND period = ?"
+SELECT_META = "SELECT value FROM meta WHERE key = ?"
+UPSERT_META = "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)"
+
+_database = None
+
+
+def database_enabled() -> bool:
+    """Checks whether the user has chosen to use the SQLite database."""
+    return os.environ.get("STUDENT_PLANNER_BACKEND", "").lower() == "sqlite"
+
+
+def open_database():
+    """Opens the database shared by all windows, if it has been enabled.
+
+    Returns:
+        The database, or None if the files in the resources folder are used.
+    """
+    global _database
+    if _database is None and database_enabled():
+        _database = PlannerDatabase()
+        _database.migrate_from_files()
+    return _database
+
+
+class PlannerDatabase:
+    """Stores tasks, subjects, and timetable slots in a SQLite database.
+
+    The connection may be used by the background thread which saves changes,
+    so each use of it holds the lock.
+
+    Attributes:
+        connection: Connection to the SQLite database file.
+        lock: Lock which must be held to use the connection.
+    """
+
+    def __init__(self, path: str = DATABASE_PATH) -> None:
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Closes the connection to the database."""
+        with self.lock:
+            self.connection.close()
+
+    def migrate_from_files(self, resources_dir: str = "resources") -> bool:
+        """Copies the data from the files in the resources folder, once only.
+
+        Args:
+            resources_dir: Folder containing the existing data files.
+
+        Returns:
+            Whether the files were migrated into the database.
+        """
+        with self.lock:
+            migrated = self.connection.execute(
+                "SELECT value FROM meta WHERE key = 'migrated'"
+            ).fetchone()
+        if migrated is not None:
+            return False
+
+        timetable_path = os.path.join(resources_dir, "timetable.bin")
+        dimensions = None
+        if os.path.exists(timetable_path):
+            timetable_file = TimetableFile(timetable_path)
+            lessons = timetable_file.read_lessons()
+            dimensions = timetable_file.dimensions
+            timetable_file.close()
+        else:
+            lessons = {
+                legacy_slot_key(slot): Lesson.from_json(lesson)
+                for slot, lesson in enumerate(
+                    _read_json_file(os.path.join(resources_dir, "timetable.json"))
+                )
+            }
+        replay = JournalReplay(
+            read_journal(os.path.join(resources_dir, "task_list.journal"))
+        )
+        task_list = replay.apply(
+            [
+                Task.from_json(task)
+                for task in _read_json_file(
+                    os.path.join(resources_dir, "task_list.json")
+                )
+            ]
+        ) + list(replay.added_tasks.values())
+        subject_list = []
+        subject_path = os.path.join(resources_dir, "subject_list.txt")
+        if os.path.exists(subject_path):
+            with open(subject_path, "r") as data_file:
+                subject_list = [line.strip("\n") for line in data_file]
+
+        # Migrates all data in a single transaction, so that it is all or none.
+        with self.lock, self.connection:
+            self.connection.executemany(
+                UPSERT_TASK,
+                (_task_row(task_id, task) for task_id, task in enumerate(task_list)),
+            )
+            self.connection.executemany(
+                INSERT_SUBJECT, ((subject,) for subject in subject_list if subject)
+            )
+            # Only occupied slots are stored, so the blank lessons of free
+            # slots in the files are skipped.
+            self.connection.executemany(
+                UPSERT_LESSON,
+                (
+                    _lesson_row(key, lesson)
+                    for key, lesson in lessons.items()
+                    if not lesson.is_empty()
+                ),
+            )
+            if dimensions is not None:
+                self.connection.execute(
+                    UPSERT_META, ("timetable_dimensions", str(dimensions))
+                )
+            if replay.next_id is not None:
+                self.connection.execute(
+                    UPSERT_META, ("next_task_id", str(replay.next_id))
+                )
+            self.connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated', '1')"
+            )
+        return True
+
+    def read_tasks(self) -> list:
+        """Reads all tasks, including their IDs.
+
+        Returns:
+            task_list: A list of all tasks.
+        """
+        with self.lock:
+            rows = self.connection.execute(SELECT_TASKS).fetchall()
+        return [
+            Task(
+                task_id,
+                task_title,
+                sys.intern(subject),
+                parse_due_date(due_date),
+                bool(completed),
+            )
+            for task_id, task_title, subject, due_date, completed in rows
+        ]
+
+    def read_next_task_id(self):
+        """Reads the ID to give the next new task.
+
+        Returns:
+            The next ID, or None if it has not been saved.
+        """
+        with self.lock:
+            row = self.connection.execute(SELECT_META, ("next_task_id",)).fetchone()
+        return None if row is None else int(row[0])
+
+    def write_tasks(self, changed_tasks: dict, next_id: int) -> None:
+        """Writes the rows of changed tasks in a single transaction.
+
+        Args:
+            changed_tasks: Changed tasks keyed by ID, with None for deletions.
+            next_id: ID to give the next new task, which is saved with them.
+        """
+        with self.lock, self.connection:
+            for task_id, task in changed_tasks.items():
+                if task is None:
+                    self.connection.execute(DELETE_TASK, (task_id,))
+                else:
+                    self.connection.execute(UPSERT_TASK, _task_row(task_id, task))
+            self.connection.execute(UPSERT_META, ("next_task_id", str(next_id)))
+
+    def read_subjects(self) -> list:
+        """Reads the names of all subjects in alphanumerical order."""
+        with self.lock:
+            rows = self.connection.execute(SELECT_SUBJECTS).fetchall()
+        return [name for (name,) in rows]
+
+    def write_subjects(self, changed_subjects: dict) -> None:
+        """Adds and deletes subjects in a single transaction.
+
+        Args:
+            changed_subjects: Whether each changed subject was added (True)
+                              or deleted (False), keyed by its name.
+        """
+        with self.lock, self.connection:
+            for name, added in changed_subjects.items():
+                if added:
+                    self.connection.execute(INSERT_SUBJECT, (name,))
+                else:
+                    self.connection.execute(DELETE_SUBJECT, (name,))
+
+    def read_timetable_dimensions(self):
+        """Reads the dimensions which the timetable was last displayed with.
+
+        Returns:
+            The dimensions of the timetable, or None if none have been saved.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                SELECT_META, ("timetable_dimensions",)
+            ).fetchone()
+        return None if row is None else parse_dimensions(row[0])
+
+    def write_timetable_dimensions(self, dimensions: Dimensions) -> None:
+        """Saves the dimensions which the timetable is displayed with."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                UPSERT_META, ("timetable_dimensions", str(dimensions))
+            )
+
+    def read_lessons(self) -> dict:
+        """Reads the lessons in each occupied timetable slot.
+
+        Returns:
+            Lessons keyed by the (week, day, period) of their slot.
+        """
+        with self.lock:
+            rows = self.connection.execute(SELECT_LESSONS).fetchall()
+        return {
+            (week, day, period): Lesson(sys.intern(subject), teacher, room)
+            for week, day, period, subject, teacher, room in rows
+        }
+
+    def write_lessons(self, changed_lessons: dict) -> None:
+        """Writes the lessons in changed timetable slots in a single transaction.
+
+        Only occupied slots are stored, so the rows of freed slots are deleted.
+
+        Args:
+            changed_lessons: Changed lessons keyed by the (week, day, period)
+                             of their slot.
+        """
+        with self.lock, self.connection:
+            for key, lesson in changed_lessons.items():
+                if lesson.is_empty():
+                    self.connection.execute(DELETE_LESSON, key)
+                else:
+                    self.connection.execute(UPSERT_LESSON, _lesson_row(key, lesson))
+
+
+def _read_json_file(path: str) -> list:
+    """Reads a list from a JSON file, which may be empty or missing."""
+    if not os.path.exists(path):
+        return []
+    try:
+        return serializer.load_file(path)
+    except ValueError:
+        return []
+
+
+def _task_row(task_id: int, task: Task) -> tuple:
+    """Converts a task to the values of its row in the tasks table."""
+    if task.task_id is not None:
+        task_id = task.task_id
+    return (
+        task_id,
+        task.task_title,
+        task.subject,
+        format_due_date(task.due_date),
+        task.completed,
+    )
+
+
+def _lesson_row(key: tuple, lesson: Lesson) -> tuple:
+    """Converts a lesson to the values of its row in the lessons table."""
+    return (*key, lesson.subject, lesson.teacher, lesson.room)
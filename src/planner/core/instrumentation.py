@@ -0,0 +1,88 @@
+"""Logging and timing of the operations in the student planner.
+
+The log level is set with the STUDENT_PLANNER_LOG_LEVEL environment variable
+(WARNING by default), and operations such as loading, saving, sorting, and
+rendering are timed in spans which are logged at the DEBUG level. Setting the
+STUDENT_PLANNER_TIMINGS environment variable logs a summary of the latency of
+each operation when the application exits.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Count, total, and maximum latency in milliseconds of each operation, which
+# are only recorded when timings are enabled. Operations may be timed on the
+# background thread which saves changes, so updates hold the lock.
+_latencies = {}
+_latencies_lock = threading.Lock()
+
+
+def timings_enabled() -> bool:
+    """Checks whether the user has chosen to report operation latencies."""
+    return bool(os.environ.get("STUDENT_PLANNER_TIMINGS"))
+
+
+def configure_logging() -> None:
+    """Sets up logging for the application from the environment variables."""
+    default_level = "INFO" if timings_enabled() else "WARNING"
+    level = os.environ.get("STUDENT_PLANNER_LOG_LEVEL", default_level).upper()
+    logging.basicConfig(
+        level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    if timings_enabled():
+        atexit.register(log_latency_summary)
+
+
+@contextmanager
+def timed(operation: str):
+    """Times a span of code and records its latency for the operation.
+
+    The latency is only recorded if timings are enabled, so that the memory
+    used does not grow with the number of times an operation is run.
+
+    Args:
+        operation: Name of the operation, such as "agenda.load".
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        latency = (time.perf_counter() - start_time) * 1000
+        if timings_enabled():
+            with _latencies_lock:
+                count, total, maximum = _latencies.get(operation, (0, 0.0, 0.0))
+                _latencies[operation] = (
+                    count + 1,
+                    total + latency,
+                    max(maximum, latency),
+                )
+        logger.debug("%s took %.1f ms", operation, latency)
+
+
+def latency_summary() -> str:
+    """Summarises the latency of each operation which has been timed.
+
+    Returns:
+        A line for each operation with its count, mean, maximum, and total.
+    """
+    lines = ["Operation latencies (ms):"]
+    with _latencies_lock:
+        latencies = sorted(_latencies.items())
+    for operation, (count, total, maximum) in latencies:
+        lines.append(
+            f"    {operation}: count {count}, mean {total / count:.1f}, "
+            f"max {maximum:.1f}, total {total:.1f}"
+        )
+    return "\n".join(lines)
+
+
+def log_latency_summary() -> None:
+    """Logs the summary of operation latencies."""
+    if _latencies:
+        logger.info(latency_summary())
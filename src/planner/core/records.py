@@ -0,0 +1,133 @@
+"""Records for the tasks in the agenda and the lessons in the timetable.
+
+The records use __slots__ rather than a dictionary per instance, and subject
+names are interned so that tasks and lessons for a subject share one string.
+Due dates are held as date ordinals, which are saved in the ISO 8601 format
+(yyyy-mm-dd), although files saved in the older dd/mm/yyyy format can still be
+read.
+"""
+
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+
+# Fields of a task in the order they are displayed as columns in the agenda.
+TASK_COLUMNS = ("task_title", "subject", "due_date", "completed")
+TASK_HEADERS = ("Task Title", "Subject", "Due Date", "Completed")
+
+
+def parse_due_date(due_date: str) -> int:
+    """Parses a saved due date into a date ordinal.
+
+    Args:
+        due_date: Due date in the format yyyy-mm-dd, or dd/mm/yyyy.
+
+    Returns:
+        The due date as a date ordinal.
+    """
+    if "/" in due_date:
+        return datetime.strptime(due_date, "%d/%m/%Y").toordinal()
+    return date.fromisoformat(due_date).toordinal()
+
+
+def format_due_date(due_date: int) -> str:
+    """Formats a due date ordinal in the ISO 8601 format to be saved."""
+    return date.fromordinal(due_date).isoformat()
+
+
+def display_due_date(due_date: int) -> str:
+    """Formats a due date ordinal in the format dd/mm/yyyy to be displayed."""
+    return date.fromordinal(due_date).strftime("%d/%m/%Y")
+
+
+@dataclass
+class Task:
+    """A task in the agenda.
+
+    Attributes:
+        task_id: Unique ID of the task, or None if it has not been given one.
+        task_title: Title of the task.
+        subject: Subject which the task is for.
+        due_date: Due date of the task as a date ordinal.
+        completed: Whether the task has been completed.
+    """
+
+    __slots__ = ("task_id", "task_title", "subject", "due_date", "completed")
+    task_id: int
+    task_title: str
+    subject: str
+    due_date: int
+    completed: bool
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Task":
+        """Creates a task from its saved JSON object.
+
+        Older files saved the completion status as "Yes" or "No", and tasks
+        saved before IDs were introduced do not have an ID.
+        """
+        return cls(
+            data.get("id"),
+            data["task_title"],
+            sys.intern(data["subject"]),
+            parse_due_date(data["due_date"]),
+            data["completed"] in (True, "Yes"),
+        )
+
+    def to_json(self) -> dict:
+        """Converts the task to a JSON object to be saved."""
+        return {
+            "id": self.task_id,
+            "task_title": self.task_title,
+            "subject": self.subject,
+            "due_date": format_due_date(self.due_date),
+            "completed": self.completed,
+        }
+
+    def display(self, column: str) -> str:
+        """Formats a field of the task to be displayed in the agenda."""
+        if column == "due_date":
+            return display_due_date(self.due_date)
+        if column == "completed":
+            return "Yes" if self.completed else "No"
+        return getattr(self, column)
+
+
+@dataclass(frozen=True)
+class Lesson:
+    """A lesson in a timetable slot.
+
+    Attributes:
+        subject: Subject of the lesson.
+        teacher: Teacher of the lesson.
+        room: Room which the lesson is in.
+    """
+
+    __slots__ = ("subject", "teacher", "room")
+    subject: str
+    teacher: str
+    room: str
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Lesson":
+        """Creates a lesson from its saved JSON object."""
+        return cls(sys.intern(data["subject"]), data["teacher"], data["room"])
+
+    def to_json(self) -> dict:
+        """Converts the lesson to a JSON object to be saved."""
+        return {"subject": self.subject, "teacher": self.teacher, "room": self.room}
+
+    def is_empty(self) -> bool:
+        """Checks whether the lesson has no details, as in a free slot.
+
+        Older files filled free slots with lessons whose details were spaces.
+        """
+        return not (self.subject.strip() or self.teacher.strip() or self.room.strip())
+
+    def display(self) -> str:
+        """Formats the lesson to be displayed in a timetable cell."""
+        return f"{self.subject}\n{self.teacher}\n{self.room}"
+
+
+# Lessons are immutable, so every empty timetable slot can share this one.
+EMPTY_LESSON = Lesson("", "", "")
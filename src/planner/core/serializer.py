@@ -0,0 +1,170 @@
+"""Reading and writing of the JSON resource files of the student planner.
+
+Files are written as compact JSON, without indentation, which makes them
+several times smaller and faster to write than indented JSON. The fastest JSON
+library which is installed is used: orjson, then ujson, and otherwise the json
+module in the standard library. A particular library can be chosen by setting
+the STUDENT_PLANNER_SERIALIZER environment variable to "orjson", "ujson", or
+"json". Indented ("pretty") JSON is still available for exporting files which
+are meant to be read by people.
+
+Very large files can also be read incrementally, one item of a JSON array at a
+time, so that the first items can be used before the rest have been read.
+"""
+
+import importlib
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# JSON libraries in order of preference.
+SERIALIZERS = ("orjson", "ujson", "json")
+
+# Number of characters read from a file at a time when it is read
+# incrementally.
+BLOCK_SIZE = 64 * 1024
+
+_SEPARATOR = re.compile(r"[\s,]*")
+_decoder = json.JSONDecoder()
+
+
+def use_serializer(name: str = "") -> str:
+    """Chooses the JSON library used to read and write files.
+
+    The library is otherwise chosen the first time a file is read or written,
+    so that importing this module does not import it.
+
+    Args:
+        name: Name of the JSON library, or an empty string to choose the
+              fastest one which is installed.
+
+    Returns:
+        The name of the JSON library which will be used.
+    """
+    global _serializer
+    if name and name not in SERIALIZERS:
+        logger.warning("Unknown serializer %r, choosing automatically", name)
+        name = ""
+    if name:
+        try:
+            _serializer = importlib.import_module(name)
+        except ImportError:
+            logger.warning("Serializer %r is not installed, using json", name)
+            _serializer = json
+        return _serializer.__name__
+
+    for name in SERIALIZERS:
+        try:
+            _serializer = importlib.import_module(name)
+            break
+        except ImportError:
+            pass
+    return _serializer.__name__
+
+
+def serializer_name() -> str:
+    """Gets the name of the JSON library used to read and write files."""
+    return _chosen_serializer().__name__
+
+
+def _chosen_serializer():
+    """Gets the JSON library, choosing it from the environment if needed."""
+    if _serializer is None:
+        use_serializer(os.environ.get("STUDENT_PLANNER_SERIALIZER", "").lower())
+    return _serializer
+
+
+_serializer = None
+
+
+def dumps(data, pretty: bool = False) -> str:
+    """Serialises data as JSON.
+
+    Args:
+        data: Lists, dictionaries, strings, numbers, booleans, and None.
+        pretty: Whether to indent the JSON so that it is easier to read.
+
+    Returns:
+        The JSON text.
+    """
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=4)
+    serializer = _chosen_serializer()
+    if serializer.__name__ == "orjson":
+        return serializer.dumps(data).decode("utf-8")
+    if serializer.__name__ == "ujson":
+        return serializer.dumps(data, ensure_ascii=False)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(text):
+    """Parses JSON text or bytes.
+
+    Raises:
+        ValueError: The text is not valid JSON.
+    """
+    return _chosen_serializer().loads(text)
+
+
+def load_file(path: str):
+    """Reads and parses a JSON file, which may be compact or indented.
+
+    Args:
+        path: Path of the JSON file.
+
+    Raises:
+        ValueError: The file is empty or is not valid JSON.
+    """
+    with open(path, "rb") as data_file:
+        return loads(data_file.read())
+
+
+def iter_array(path: str, block_size: int = BLOCK_SIZE):
+    """Reads the items of a JSON array in a file one at a time.
+
+    The file is read a block at a time, and each item is decoded as soon as
+    the whole of it has been read, so that memory use and the time until the
+    first item is yielded do not depend on the size of the file. The items
+    must be JSON objects or arrays, so that an item which is cut off at the
+    end of a block cannot be mistaken for a whole item. The json module is
+    used whichever library has been chosen, as the others cannot decode part
+    of a string.
+
+    Args:
+        path: Path of the JSON file, which holds an array.
+        block_size: Number of characters to read from the file at a time.
+
+    Yields:
+        Each item of the array in order.
+
+    Raises:
+        ValueError: The file is empty or is not a valid JSON array.
+    """
+    with open(path, "r", encoding="utf-8") as data_file:
+        buffer = data_file.read(block_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"Expected a JSON array in {path}")
+        position = 1
+        end_of_file = False
+
+        while True:
+            position = _SEPARATOR.match(buffer, position).end()
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                if position == len(buffer):
+                    raise ValueError("No item in the buffer")
+                item, position = _decoder.raw_decode(buffer, position)
+            except ValueError:
+                # The item continues in the next block of the file.
+                if end_of_file:
+                    raise ValueError(f"Unterminated JSON array in {path}")
+                block = data_file.read(block_size)
+                end_of_file = not block
+                buffer = buffer[position:] + block
+                position = 0
+                continue
+            yield item
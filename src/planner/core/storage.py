@@ -0,0 +1,129 @@
+"""Safe writing of the files which store the data of the student planner.
+
+Files are written atomically, so that they are never left partly written.
+
+The agenda and the command line interface each give new tasks the next ID
+after the tasks they have read, so only one of them may change the tasks at a
+time. Whichever starts first takes the lock on the tasks, which the operating
+system releases when its process ends, even if it stops unexpectedly. The
+holder of the lock writes its name into the lock file, so that the others can
+tell whether it is the agenda or a short-lived command.
+"""
+
+import os
+import stat
+import tempfile
+
+LOCK_PATH = "resources/task_list.lock"
+
+# Names written into the lock file by its holder.
+AGENDA_HOLDER = "agenda"
+CLI_HOLDER = "cli"
+
+# The umask can only be read by setting it, which is not safe once files are
+# being written on other threads, so it is read once on import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class LockedError(Exception):
+    """The tasks are locked by another process which may change them.
+
+    Attributes:
+        holder: Name of the program which holds the lock, or "" if it is not
+                known.
+    """
+
+    def __init__(self, message: str, holder: str = "") -> None:
+        super().__init__(message)
+        self.holder = holder
+
+
+def lock_tasks(wait: bool, holder: str, path: str = LOCK_PATH):
+    """Takes the lock on the tasks, which is held until the file is closed.
+
+    Args:
+        wait: Whether to wait for another process to release the lock, rather
+              than raising LockedError.
+        holder: Name of the program taking the lock, such as AGENDA_HOLDER.
+        path: Path of the lock file.
+
+    Returns:
+        The open lock file.
+
+    Raises:
+        LockedError: Another process holds the lock, and wait is False.
+    """
+    lock_file = open(path, "a")
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            mode = msvcrt.LK_LOCK if wait else msvcrt.LK_NBLCK
+            msvcrt.locking(lock_file.fileno(), mode, 1)
+        else:
+            import fcntl
+
+            mode = fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB
+            fcntl.flock(lock_file.fileno(), mode)
+    except OSError:
+        lock_file.close()
+        raise LockedError(
+            f"The tasks are locked by another process: {path}", _read_holder(path)
+        )
+    lock_file.truncate(0)
+    lock_file.write(holder)
+    lock_file.flush()
+    return lock_file
+
+
+def _read_holder(path: str) -> str:
+    """Reads the name of the holder of a lock, which is "" if it is not known.
+
+    On Windows the lock file cannot be read while it is locked, so the holder
+    is never known there.
+    """
+    try:
+        with open(path) as lock_file:
+            return lock_file.read()
+    except OSError:
+        return ""
+
+
+def write_atomically(path: str, contents: str) -> None:
+    """Replaces the contents of a file in a single step.
+
+    The contents are written to a temporary file in the same folder, which
+    then replaces the original file. If the application stops part-way
+    through, the file therefore has either its old or its new contents,
+    rather than being left partly written. The file keeps its permissions,
+    or is given the default permissions if it is new.
+
+    Args:
+        path: Path of the file to write.
+        contents: Text or bytes to write to the file.
+    """
+    folder = os.path.dirname(path) or "."
+    file_descriptor, temp_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    if isinstance(contents, bytes):
+        temp_file = os.fdopen(file_descriptor, "wb")
+    else:
+        temp_file = os.fdopen(file_descriptor, "w", encoding="utf-8")
+    try:
+        with temp_file:
+            temp_file.write(contents)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _file_mode(path: str) -> int:
+    """Gets the permissions of a file, or the default for a new file."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
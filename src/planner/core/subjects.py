@@ -0,0 +1,131 @@
+"""The list of subjects which students may choose from for tasks and lessons.
+
+The subjects are read from the SQLite database, if it is enabled, or otherwise
+from the subject list text file, and are kept sorted without duplicates.
+"""
+
+import os
+from bisect import bisect_left
+from functools import partial
+
+from planner.core.database import open_database
+from planner.core.instrumentation import timed
+from planner.core.storage import write_atomically
+
+SUBJECT_LIST_PATH = "resources/subject_list.txt"
+
+
+def read_subjects(database=None) -> list:
+    """Reads the list of subjects from the database or text file.
+
+    Args:
+        database: SQLite database to read the subjects from, if enabled.
+
+    Returns:
+        subject_list: A sorted list of the names of all subjects, without
+                      duplicates or blank lines.
+    """
+    with timed("subjects.load"):
+        if database is not None:
+            subject_list = database.read_subjects()
+        elif os.path.exists(SUBJECT_LIST_PATH):
+            with open(SUBJECT_LIST_PATH, "r") as data_file:
+                subject_list = [line.strip("\n") for line in data_file.readlines()]
+        else:
+            subject_list = []
+
+    with timed("subjects.sort"):
+        return sorted(set(subject for subject in subject_list if subject))
+
+
+def open_subject_list() -> "SubjectList":
+    """Opens the list of subjects from the SQLite database if it is enabled.
+
+    Otherwise, the subjects are read from the subject list text file.
+
+    Returns:
+        The list of subjects.
+    """
+    database = open_database()
+    return SubjectList(read_subjects(database), database)
+
+
+class SubjectList:
+    """Holds the sorted names of all subjects and the changes to be saved.
+
+    New subjects are inserted in place by bisection, so the list stays sorted
+    without duplicates.
+
+    Attributes:
+        changed_subjects: Whether each subject changed since it was saved was
+                          added (True) or deleted (False).
+        database: SQLite database which subjects are saved to, if enabled.
+        subject_list: Sorted list of the names of all subjects.
+    """
+
+    def __init__(self, subject_list: list, database=None) -> None:
+        self.subject_list = subject_list
+        self.database = database
+        self.changed_subjects = {}
+
+    def __len__(self) -> int:
+        return len(self.subject_list)
+
+    def __getitem__(self, row: int) -> str:
+        return self.subject_list[row]
+
+    def __contains__(self, subject: str) -> bool:
+        row = self.row(subject)
+        return row < len(self.subject_list) and self.subject_list[row] == subject
+
+    def row(self, subject: str) -> int:
+        """Gets the row which the subject is, or would be inserted, in."""
+        return bisect_left(self.subject_list, subject)
+
+    def add(self, subject: str) -> bool:
+        """Adds a subject to the list in alphanumerical order.
+
+        Args:
+            subject: Name of the subject to add.
+
+        Returns:
+            Whether the subject was added, as it was not already in the list.
+        """
+        if subject in self:
+            return False
+        self.subject_list.insert(self.row(subject), subject)
+        self.changed_subjects[subject] = True
+        return True
+
+    def delete(self, row: int) -> None:
+        """Deletes the subject in the given row from the list."""
+        subject = self.subject_list.pop(row)
+        self.changed_subjects[subject] = False
+
+    def snapshot(self):
+        """Captures the changed subjects to be saved.
+
+        Returns:
+            write: A function which writes the changed subjects to the
+                   database, or rewrites the text file, which may be called
+                   on another thread.
+            restore: A function which records the subjects as changed again
+                     if the write fails, so that they are saved next time.
+        """
+        if self.database is not None:
+            write = partial(self.database.write_subjects, self.changed_subjects)
+        else:
+            contents = "".join(subject + "\n" for subject in self.subject_list)
+            write = partial(write_atomically, SUBJECT_LIST_PATH, contents)
+        restore = partial(self._restore, self.changed_subjects)
+        self.changed_subjects = {}
+        return write, restore
+
+    def _restore(self, changed_subjects: dict) -> None:
+        """Records subjects whose save failed as changed again.
+
+        Subjects which have changed again since are left as they are, so that
+        their latest change is saved.
+        """
+        for subject, added in changed_subjects.items():
+            self.changed_subjects.setdefault(subject, added)
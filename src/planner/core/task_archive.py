@@ -0,0 +1,220 @@
+"""An archive of the completed tasks which are no longer kept in the agenda.
+
+Completed tasks which were due more than a number of days ago are moved out of
+the task list into an archive file for the school term they were due in, so
+that the tasks which are read, sorted, and saved every time the agenda is
+opened are mostly the tasks which are still to be done. The number of days is
+chosen with the STUDENT_PLANNER_ARCHIVE_DAYS environment variable.
+
+Each archive file holds a task per line as gzip-compressed JSON Lines, and is
+named after its term, such as "2021-autumn.jsonl.gz". Tasks are archived by
+appending another gzip member to the file, which is read back as a single
+stream, so archived tasks are never rewritten. The archive is only read when
+the user asks to see their history, or once to find the IDs which new tasks
+must not be given, if the tasks were saved before their next ID was saved.
+
+A task is written to the archive before it is deleted from the task list, so
+if the application stops in between, the task is archived again the next time.
+Identical lines are therefore only read once.
+"""
+
+import gzip
+import logging
+import os
+import zlib
+from datetime import date
+
+from planner.core import serializer
+from planner.core.instrumentation import timed
+from planner.core.records import Task
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FOLDER = "resources/archive"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+# Number of days after their due date which completed tasks are archived.
+DEFAULT_ARCHIVE_DAYS = 180
+
+# Names of the terms, by the month which they start in.
+TERM_STARTS = ((9, "autumn"), (5, "summer"), (1, "spring"))
+
+
+def archive_days() -> int:
+    """Gets the number of days chosen with the environment variable.
+
+    Returns:
+        The number of days after their due date which completed tasks are
+        archived.
+    """
+    text = os.environ.get("STUDENT_PLANNER_ARCHIVE_DAYS")
+    if not text:
+        return DEFAULT_ARCHIVE_DAYS
+    try:
+        days = int(text)
+        if days < 0:
+            raise ValueError
+    except ValueError:
+        logger.warning("Invalid number of archive days %r, using default", text)
+        return DEFAULT_ARCHIVE_DAYS
+    return days
+
+
+def term_name(due_date: int) -> str:
+    """Names the school term which a due date is in, such as "2021-autumn".
+
+    The autumn term runs from September to December, the spring term from
+    January to April, and the summer term from May to August.
+
+    Args:
+        due_date: Due date as a date ordinal.
+    """
+    day = date.fromordinal(due_date)
+    for month, term in TERM_STARTS:
+        if day.month >= month:
+            return f"{day.year}-{term}"
+
+
+def archived_terms(folder: str = ARCHIVE_FOLDER) -> list:
+    """Gets the names of the terms which have archived tasks, latest first.
+
+    Other files in the folder, whose names are not those of terms, are
+    skipped.
+    """
+    if not os.path.isdir(folder):
+        return []
+    terms = [
+        file_name[: -len(ARCHIVE_SUFFIX)]
+        for file_name in os.listdir(folder)
+        if file_name.endswith(ARCHIVE_SUFFIX)
+    ]
+    return sorted(
+        (term for term in terms if _term_start(term) is not None),
+        key=_term_start,
+        reverse=True,
+    )
+
+
+def _term_start(term: str):
+    """Gets the year and month which a term starts in, to order the terms.
+
+    Returns:
+        The year and month, or None if the name is not that of a term.
+    """
+    year, _, name = term.partition("-")
+    months = {term: month for month, term in TERM_STARTS}
+    if not year.isdigit() or name not in months:
+        return None
+    return int(year), months[name]
+
+
+def archive_tasks(task_list: list, folder: str = ARCHIVE_FOLDER) -> None:
+    """Appends tasks to the archive files of their terms.
+
+    The files are flushed to the disk before this returns, so that the tasks
+    can then be deleted from the task list.
+
+    Args:
+        task_list: Tasks to archive.
+        folder: Folder of the archive files.
+    """
+    lines_by_term = {}
+    for task in task_list:
+        lines_by_term.setdefault(term_name(task.due_date), []).append(
+            serializer.dumps(task.to_json()) + "\n"
+        )
+
+    os.makedirs(folder, exist_ok=True)
+    for term, lines in lines_by_term.items():
+        path = os.path.join(folder, term + ARCHIVE_SUFFIX)
+        with open(path, "ab") as archive_file:
+            with gzip.GzipFile(fileobj=archive_file, mode="ab") as gzip_file:
+                gzip_file.write("".join(lines).encode("utf-8"))
+            archive_file.flush()
+            os.fsync(archive_file.fileno())
+
+
+def read_archive(term: str, folder: str = ARCHIVE_FOLDER) -> list:
+    """Reads the archived tasks of a term.
+
+    Lines which were only partly written, because the application stopped
+    while they were being archived, are skipped.
+
+    Args:
+        term: Name of the term.
+        folder: Folder of the archive files.
+
+    Returns:
+        task_list: The archived tasks in the order they were archived.
+    """
+    path = os.path.join(folder, term + ARCHIVE_SUFFIX)
+    task_list = []
+    seen_lines = set()
+    if not os.path.exists(path):
+        return task_list
+    with timed("archive.load"):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as archive_file:
+                for line in archive_file:
+                    if line in seen_lines:
+                        continue
+                    seen_lines.add(line)
+                    try:
+                        task_list.append(Task.from_json(serializer.loads(line)))
+                    except (KeyError, TypeError, ValueError):
+                        logger.warning("Skipping a damaged line in %s", path)
+        except (EOFError, OSError, zlib.error):
+            logger.warning("Archive %s ends with a partly written task", path)
+    return task_list
+
+
+def archived_next_id(folder: str = ARCHIVE_FOLDER) -> int:
+    """Gets the ID after those of all archived tasks.
+
+    This reads the whole archive, so it is only used for tasks which were
+    saved before the next ID was saved with them.
+    """
+    next_id = 0
+    for term in archived_terms(folder):
+        for task in read_archive(term, folder):
+            if task.task_id is not None:
+                next_id = max(next_id, task.task_id + 1)
+    return next_id
+
+
+def old_completed_tasks(task_store, days: int = None, today: int = None) -> list:
+    """Finds the completed tasks which are old enough to be archived.
+
+    Args:
+        task_store: Store of the tasks in the agenda.
+        days: Number of days after their due date which completed tasks are
+              archived, or None to use the number chosen by the user.
+        today: Today's date as a date ordinal, or None for the current date.
+
+    Returns:
+        The tasks in order of due date.
+    """
+    if days is None:
+        days = archive_days()
+    if today is None:
+        today = date.today().toordinal()
+    return task_store.completed_before(today - days)
+
+
+def archive_completed_tasks(
+    task_store, task_list: list, folder: str = ARCHIVE_FOLDER
+) -> None:
+    """Moves completed tasks from the task store into the archive.
+
+    The tasks are deleted from the store, so the change is saved the next time
+    the store is saved.
+
+    Args:
+        task_store: Store of the tasks in the agenda.
+        task_list: Tasks found by old_completed_tasks.
+        folder: Folder of the archive files.
+    """
+    with timed("agenda.archive"):
+        archive_tasks(task_list, folder)
+        task_store.delete_all([task.task_id for task in task_list])
+    logger.info("Archived %d completed tasks", len(task_list))
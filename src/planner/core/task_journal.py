@@ -0,0 +1,195 @@
+"""An append-only journal of the changes made to the tasks in the agenda.
+
+Rather than rewriting the whole task list file after every edit, each change
+is appended to the journal as a JSON Lines record:
+
+    {"op": "add", "task": {...}}
+    {"op": "update", "task": {...}}
+    {"op": "complete", "id": 3}
+    {"op": "uncomplete", "id": 3}
+    {"op": "delete", "id": 3}
+    {"op": "next_id", "id": 8}
+
+The task list file is a snapshot of the tasks, and the journal records the
+changes made since it was written. Reading the tasks replays the journal on
+top of the snapshot. Once the journal grows past a size threshold, it is
+compacted by rewriting the snapshot and emptying the journal, apart from a
+record of the ID to give the next new task. That ID is above the IDs of all
+tasks which have ever been saved, so the IDs of tasks which have since been
+deleted or archived are never given again.
+
+Every record sets a task to a state rather than changing it relative to its
+previous state, so replaying a record more than once has the same result as
+replaying it once. If the application stops after a snapshot is rewritten but
+before the journal is emptied, replaying the journal again is therefore
+harmless. If it stops part-way through an append, the partly written record at
+the end of the journal is discarded when the journal is next read.
+"""
+
+import logging
+import os
+
+from planner.core import serializer
+from planner.core.records import Task
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = "resources/task_list.journal"
+
+# Size in bytes which the journal may grow to before it is compacted.
+COMPACTION_THRESHOLD = 256 * 1024
+
+
+def journal_size(path: str) -> int:
+    """Gets the size of the journal in bytes, which is 0 if it is missing."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def read_journal(path: str) -> list:
+    """Reads the records in the journal.
+
+    A partly written record at the end of the journal is truncated, so that
+    the records appended after it can be read.
+
+    Args:
+        path: Path of the journal.
+
+    Returns:
+        records: A list of the records in the order they were appended.
+    """
+    if not os.path.exists(path):
+        return []
+
+    records = []
+    with open(path, "rb") as journal_file:
+        valid_size = 0
+        for line in journal_file:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("record was not fully written")
+                records.append(serializer.loads(line))
+            except ValueError:
+                logger.warning(
+                    "Discarding partly written record at byte %d of %s",
+                    valid_size,
+                    path,
+                )
+                break
+            valid_size += len(line)
+
+    if valid_size < journal_size(path):
+        os.truncate(path, valid_size)
+    return records
+
+
+class JournalReplay:
+    """The changes recorded in the journal, to be applied to the snapshot.
+
+    The records are collapsed into the latest state of each changed task, so
+    that they can be applied to the tasks in the snapshot as they are read,
+    one chunk at a time.
+
+    Attributes:
+        added_tasks: Tasks added or updated since the snapshot was written,
+                     keyed by ID.
+        completion: Completion status of the other changed tasks, keyed by ID.
+        deleted_ids: IDs of the tasks deleted since the snapshot was written.
+        next_id: ID to give the next new task, which is above the IDs in all
+                 of the records, or None if the journal was written before
+                 the next ID was recorded in it.
+    """
+
+    def __init__(self, records: list) -> None:
+        self.added_tasks = {}
+        self.completion = {}
+        self.deleted_ids = set()
+        self.next_id = None
+        last_id = -1
+        for record in records:
+            operation = record["op"]
+            if operation == "next_id":
+                self.next_id = max(self.next_id or 0, record["id"])
+                continue
+            task_id = record["task"]["id"] if "task" in record else record["id"]
+            last_id = max(last_id, task_id)
+            if operation in ("add", "update"):
+                task = Task.from_json(record["task"])
+                self.added_tasks[task.task_id] = task
+                self.completion.pop(task.task_id, None)
+                self.deleted_ids.discard(task.task_id)
+            elif operation == "delete":
+                self.added_tasks.pop(record["id"], None)
+                self.completion.pop(record["id"], None)
+                self.deleted_ids.add(record["id"])
+            elif record["id"] in self.added_tasks:
+                self.added_tasks[record["id"]].completed = operation == "complete"
+            else:
+                self.completion[record["id"]] = operation == "complete"
+        if self.next_id is not None:
+            self.next_id = max(self.next_id, last_id + 1)
+
+    def apply(self, task_list: list) -> list:
+        """Applies the changes to tasks read from the snapshot.
+
+        Args:
+            task_list: Some or all of the tasks in the snapshot.
+
+        Returns:
+            task_list: The tasks which have not since been deleted, or added
+                       again, with their latest completion status.
+        """
+        if not (self.added_tasks or self.completion or self.deleted_ids):
+            return task_list
+
+        changed_tasks = []
+        for task in task_list:
+            if task.task_id in self.deleted_ids or task.task_id in self.added_tasks:
+                continue
+            if task.task_id in self.completion:
+                task.completed = self.completion[task.task_id]
+            changed_tasks.append(task)
+        return changed_tasks
+
+
+def append_to_journal(path: str, lines: str) -> None:
+    """Appends records to the journal and waits for them to reach the disk.
+
+    If the append fails, the journal is truncated back to its previous size,
+    so that a partly written record does not hide the records appended after
+    it.
+
+    Args:
+        path: Path of the journal.
+        lines: Records to append, each on its own line.
+    """
+    size = journal_size(path)
+    try:
+        with open(path, "a", encoding="utf-8") as journal_file:
+            journal_file.write(lines)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+    except OSError:
+        if journal_size(path) > size:
+            os.truncate(path, size)
+        raise
+
+
+def reset_journal(path: str, next_id: int) -> None:
+    """Empties the journal once its records are included in the snapshot.
+
+    Args:
+        path: Path of the journal.
+        next_id: ID to give the next new task, which is kept in the journal.
+    """
+    with open(path, "w", encoding="utf-8") as journal_file:
+        journal_file.write(next_id_record(next_id))
+        journal_file.flush()
+        os.fsync(journal_file.fileno())
+
+
+def next_id_record(next_id: int) -> str:
+    """Formats the record of the ID to give the next new task as a line."""
+    return serializer.dumps({"op": "next_id", "id": next_id}) + "\n"
@@ -0,0 +1,165 @@
+"""Searching of the tasks in the agenda by the words in them and by facets.
+
+The words in the title and subject of each task are indexed in an inverted
+index, which maps each word to the IDs of the tasks it is in. The words are
+also kept in sorted order, so that the tasks with a word starting with a
+prefix are found by bisection rather than by scanning every task.
+
+The views of the agenda by due date, such as the tasks due this week, are
+searches by due date alone, which are answered from the due date index of the
+task store.
+"""
+
+import re
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+
+from planner.core.records import Task
+
+_WORD = re.compile(r"\w+")
+
+# Views of the agenda by due date, in the order that they are offered.
+DUE_DATE_VIEWS = ("All Tasks", "Today", "This Week", "Overdue", "Custom Range")
+
+
+def words(text: str) -> list:
+    """Splits text into the lowercase words which are indexed."""
+    return _WORD.findall(text.casefold())
+
+
+def task_words(task: Task) -> set:
+    """Gets the words in the title and subject of a task."""
+    return set(words(task.task_title)) | set(words(task.subject))
+
+
+@dataclass(frozen=True)
+class TaskQuery:
+    """A search for tasks, which match when they match every criterion given.
+
+    Attributes:
+        text: Words which each start a word in the title or subject.
+        subject: Subject which the tasks are for, or None for any subject.
+        first_due_date: Earliest due date as a date ordinal, or None.
+        last_due_date: Latest due date as a date ordinal, or None.
+        completed: Whether the tasks have been completed, or None for both.
+    """
+
+    text: str = ""
+    subject: str = None
+    first_due_date: int = None
+    last_due_date: int = None
+    completed: bool = None
+
+    def matches(self, task: Task) -> bool:
+        """Checks whether a single task matches the query."""
+        if not self.matches_facets(task):
+            return False
+        indexed_words = task_words(task)
+        return all(
+            any(word.startswith(prefix) for word in indexed_words)
+            for prefix in words(self.text)
+        )
+
+    def matches_facets(self, task: Task) -> bool:
+        """Checks whether a task matches the query, apart from its text."""
+        if self.subject is not None and task.subject != self.subject:
+            return False
+        if self.completed is not None and task.completed != self.completed:
+            return False
+        if self.first_due_date is not None and task.due_date < self.first_due_date:
+            return False
+        if self.last_due_date is not None and task.due_date > self.last_due_date:
+            return False
+        return True
+
+
+def due_date_view(view: str, today: int, custom_range: tuple = None) -> TaskQuery:
+    """Gets the search for the tasks in a view of the agenda by due date.
+
+    Args:
+        view: Name of the view, which is one of DUE_DATE_VIEWS.
+        today: Today's date as a date ordinal.
+        custom_range: First and last due dates of the custom range as date
+                      ordinals.
+
+    Returns:
+        The search for the tasks in the view. Overdue tasks are those which
+        are incomplete and were due before today, and the tasks due this week
+        are those due in the seven days from today.
+    """
+    if view == "Today":
+        return TaskQuery(first_due_date=today, last_due_date=today)
+    if view == "This Week":
+        return TaskQuery(first_due_date=today, last_due_date=today + 6)
+    if view == "Overdue":
+        return TaskQuery(last_due_date=today - 1, completed=False)
+    if view == "Custom Range":
+        first_due_date, last_due_date = custom_range
+        return TaskQuery(first_due_date=first_due_date, last_due_date=last_due_date)
+    return TaskQuery()
+
+
+class TaskSearchIndex:
+    """Indexes tasks by the words in their titles and subjects, and by subject.
+
+    Attributes:
+        subject_ids: IDs of the tasks for each subject.
+    """
+
+    def __init__(self, task_list: list = ()) -> None:
+        self._word_ids = {}
+        self.subject_ids = {}
+        for task in task_list:
+            for word in task_words(task):
+                self._word_ids.setdefault(word, set()).add(task.task_id)
+            self.subject_ids.setdefault(task.subject, set()).add(task.task_id)
+        self._words = sorted(self._word_ids)
+
+    def add(self, task: Task) -> None:
+        """Adds a task to the index."""
+        for word in task_words(task):
+            task_ids = self._word_ids.get(word)
+            if task_ids is None:
+                task_ids = self._word_ids[word] = set()
+                insort(self._words, word)
+            task_ids.add(task.task_id)
+        self.subject_ids.setdefault(task.subject, set()).add(task.task_id)
+
+    def remove(self, task: Task) -> None:
+        """Removes a task from the index."""
+        for word in task_words(task):
+            task_ids = self._word_ids[word]
+            task_ids.discard(task.task_id)
+            if not task_ids:
+                del self._word_ids[word]
+                del self._words[bisect_left(self._words, word)]
+        subject_ids = self.subject_ids[task.subject]
+        subject_ids.discard(task.task_id)
+        if not subject_ids:
+            del self.subject_ids[task.subject]
+
+    def with_prefix(self, prefix: str) -> set:
+        """Finds the tasks with a word starting with the prefix.
+
+        Returns:
+            The IDs of the tasks.
+        """
+        task_ids = set()
+        row = bisect_left(self._words, prefix)
+        while row < len(self._words) and self._words[row].startswith(prefix):
+            task_ids |= self._word_ids[self._words[row]]
+            row += 1
+        return task_ids
+
+    def with_words(self, text: str):
+        """Finds the tasks with a word starting with each word of the text.
+
+        Returns:
+            The IDs of the tasks, or None if the text has no words.
+        """
+        matches = sorted(
+            (self.with_prefix(prefix) for prefix in set(words(text))), key=len
+        )
+        if not matches:
+            return None
+        return matches[0].intersection(*matches[1:])
@@ -0,0 +1,591 @@
+"""A store which keeps the tasks in the agenda indexed in memory.
+
+The task list JSON file and its journal (or the SQLite database, if enabled)
+are the single source of truth for the agenda. Tasks are indexed by ID, by due
+date, and by completion status, so that the views of the agenda can be served
+without filtering or sorting the whole task list.
+"""
+
+import sys
+from bisect import bisect_left, insort
+from dataclasses import replace
+from functools import partial
+
+from planner.core import serializer
+from planner.core.instrumentation import timed
+from planner.core.records import Task
+from planner.core.storage import write_atomically
+from planner.core.task_archive import archived_next_id
+from planner.core.task_search import TaskQuery, TaskSearchIndex
+from planner.core.task_journal import (
+    COMPACTION_THRESHOLD,
+    JOURNAL_PATH,
+    append_to_journal,
+    journal_size,
+    next_id_record,
+    reset_journal,
+)
+
+TASK_LIST_PATH = "resources/task_list.json"
+
+
+class TaskStore:
+    """Stores all tasks, indexed by ID, due date, and completion status.
+
+    The due date and status indexes are lists of (due date ordinal, ID) keys
+    kept in sorted order, so that tasks due on the same day stay in the order
+    that they were added, and tasks are inserted and removed by bisection.
+
+    Changes are recorded until they are saved, so that only the changed tasks
+    are written, either as rows in the SQLite database or as records appended
+    to the journal of the JSON file.
+
+    The ID to give the next new task is saved with the tasks, so that new
+    tasks are never given the IDs of tasks which have been deleted or
+    archived.
+
+    The tasks can also be searched by the words in them. The search index is
+    built the first time it is needed, and then kept up to date as tasks are
+    added and deleted.
+
+    Attributes:
+        database: SQLite database which the tasks are saved to, if enabled.
+        journal_path: Path of the journal of changes to the JSON file.
+        loading: Whether tasks are still being read from the JSON file, in
+                 which case it is not rewritten, so that the tasks which have
+                 not been read yet are not lost.
+        path: Path of the JSON file which the tasks are saved to otherwise.
+    """
+
+    def __init__(
+        self,
+        task_list: list,
+        database=None,
+        path: str = TASK_LIST_PATH,
+        journal_path: str = JOURNAL_PATH,
+        next_id: int = 0,
+    ) -> None:
+        """Creates a store of tasks.
+
+        Args:
+            task_list: Tasks which have been read from the saved file or
+                       database.
+            database: SQLite database which the tasks are saved to, if
+                      enabled.
+            path: Path of the JSON file which the tasks are saved to
+                  otherwise.
+            journal_path: Path of the journal of changes to the JSON file.
+            next_id: ID to give the next new task, which was saved with the
+                     tasks, or None if it was not saved. In that case new
+                     tasks are given IDs after those of the archived tasks too,
+                     and the next ID is saved the next time the tasks are.
+        """
+        self.database = database
+        self.path = path
+        self.journal_path = journal_path
+        self._tasks_by_id = {}
+        self._due_keys = {}
+        self._status_index = {False: [], True: []}
+        self._changed_tasks = {}
+        self._added_ids = set()
+        self._updated_ids = set()
+        self._journal_size = journal_size(journal_path)
+        self._compaction_needed = False
+        if next_id is None:
+            next_id = archived_next_id()
+            self._compaction_needed = database is None
+        self._next_id = next_id
+        self._due_index = []
+        self._search_index = None
+        self.loading = False
+        self.extend(task_list)
+
+    def __len__(self) -> int:
+        return len(self._tasks_by_id)
+
+    @property
+    def compaction_needed(self) -> bool:
+        """Whether the task list file must be rewritten on the next save."""
+        return self._compaction_needed
+
+    def _new_id(self) -> int:
+        """Generates an ID which has not been used by any other task."""
+        task_id = self._next_id
+        self._next_id += 1
+        return task_id
+
+    @staticmethod
+    def due_key(task: Task) -> tuple:
+        """Gets the key which orders the task in the indexes and searches."""
+        return task.due_date, task.task_id
+
+    def _index(self, include_completed: bool) -> list:
+        """Gets the sorted keys of all tasks or only incomplete tasks."""
+        if include_completed:
+            return self._due_index
+        return self._status_index[False]
+
+    def new_task(self, task_title: str, subject: str, due_date: int) -> Task:
+        """Creates an incomplete task with a new ID, without storing it.
+
+        Args:
+            task_title: Title of the task.
+            subject: Subject which the task is for.
+            due_date: Due date of the task as a date ordinal.
+
+        Returns:
+            The new task.
+
+        Raises:
+            RuntimeError: The tasks are still being read, so the new ID could
+                          be that of a task which has not been read yet.
+        """
+        if self.loading:
+            raise RuntimeError("Tasks cannot be created until all are read")
+        return Task(self._new_id(), task_title, sys.intern(subject), due_date, False)
+
+    def get(self, task_id: int) -> Task:
+        """Gets a task by its ID in constant time."""
+        return self._tasks_by_id[task_id]
+
+    def count(self, include_completed: bool) -> int:
+        """Counts all tasks or only incomplete tasks."""
+        return len(self._index(include_completed))
+
+    def count_due_before(self, due_date: int, include_completed: bool) -> int:
+        """Counts the tasks which are due before a date.
+
+        This is also the row of the first task due on or after the date, in
+        order of due date.
+
+        Args:
+            due_date: Date ordinal which the tasks are due before.
+            include_completed: Whether completed tasks are counted.
+        """
+        return bisect_left(self._index(include_completed), (due_date,))
+
+    def completed_before(self, due_date: int) -> list:
+        """Gets the completed tasks which were due before a date.
+
+        Args:
+            due_date: Date ordinal which the tasks were due before.
+
+        Returns:
+            The tasks in order of due date.
+        """
+        index = self._status_index[True]
+        return [
+            self._tasks_by_id[task_id]
+            for _, task_id in index[: bisect_left(index, (due_date,))]
+        ]
+
+    def task_at(self, row: int, include_completed: bool) -> Task:
+        """Gets the task at a position in order of due date.
+
+        Args:
+            row: Position of the task.
+            include_completed: Whether completed tasks are counted.
+
+        Returns:
+            The task at the given position.
+        """
+        return self._tasks_by_id[self._index(include_completed)[row][1]]
+
+    def row(self, task: Task, include_completed: bool) -> int:
+        """Finds the position of a task in order of due date.
+
+        If the task is not stored, this is the position it would be added at.
+
+        Args:
+            task: The task to find the position of.
+            include_completed: Whether completed tasks are counted.
+
+        Returns:
+            The position of the task.
+        """
+        key = self._due_keys.get(task.task_id) or self.due_key(task)
+        return bisect_left(self._index(include_completed), key)
+
+    def extend(self, task_list: list) -> None:
+        """Adds tasks which have been read from the saved file or database.
+
+        Unlike add, the tasks are not saved again. The tasks are sorted and
+        merged into the indexes together, which takes linear time if they come
+        before or after all stored tasks, as when they are read in order of
+        due date.
+
+        Args:
+            task_list: Tasks to add.
+        """
+        keys = []
+        for task in task_list:
+            # Gives new IDs to tasks saved before IDs were introduced. The JSON
+            # file is rewritten on the next save so that the journal never
+            # refers to IDs which are not saved in it.
+            if task.task_id is None or task.task_id in self._tasks_by_id:
+                task.task_id = self._new_id()
+                self._compaction_needed = True
+            self._next_id = max(self._next_id, task.task_id + 1)
+            self._tasks_by_id[task.task_id] = task
+            key = self.due_key(task)
+            self._due_keys[task.task_id] = key
+            keys.append(key)
+            if self._search_index is not None:
+                self._search_index.add(task)
+        self._merge_keys(keys)
+
+    def _merge_keys(self, keys: list) -> None:
+        """Sorts the keys of stored tasks and merges them into the indexes."""
+        with timed("agenda.sort"):
+            keys.sort()
+            _merge(self._due_index, keys)
+            for completed, status_index in self._status_index.items():
+                _merge(
+                    status_index,
+                    [
+                        key
+                        for key in keys
+                        if self._tasks_by_id[key[1]].completed == completed
+                    ],
+                )
+
+    def search_index(self) -> TaskSearchIndex:
+        """Gets the search index of the tasks, building it if needed."""
+        if self._search_index is None:
+            with timed("agenda.index"):
+                self._search_index = TaskSearchIndex(self._tasks_by_id.values())
+        return self._search_index
+
+    def search(self, query: TaskQuery) -> list:
+        """Finds the tasks which match a query.
+
+        The tasks due within the range of dates are found by bisection of the
+        due date index, so that a query by date alone takes time in
+        proportion to the number of tasks found. Otherwise, only the tasks
+        found by subject or by words in the search index are checked.
+
+        Args:
+            query: Criteria which the tasks must match.
+
+        Returns:
+            The keys of the matching tasks in order of due date.
+        """
+        matches = []
+        if query.subject is not None:
+            matches.append(self.search_index().subject_ids.get(query.subject, set()))
+        if query.text:
+            task_ids = self.search_index().with_words(query.text)
+            if task_ids is not None:
+                matches.append(task_ids)
+
+        if query.completed is None:
+            index = self._due_index
+        else:
+            index = self._status_index[query.completed]
+        if not matches:
+            start = 0
+            stop = len(index)
+            if query.first_due_date is not None:
+                start = bisect_left(index, (query.first_due_date,))
+            if query.last_due_date is not None:
+                stop = bisect_left(index, (query.last_due_date + 1,))
+            return index[start:stop]
+
+        matches.sort(key=len)
+        keys = [
+            self._due_keys[task_id]
+            for task_id in matches[0].intersection(*matches[1:])
+            if query.matches_facets(self._tasks_by_id[task_id])
+        ]
+        keys.sort()
+        return keys
+
+    def insertion_rows(self, task_list: list, include_completed: bool):
+        """Finds the rows which tasks would take if they were added together.
+
+        Args:
+            task_list: Tasks which are not stored yet.
+            include_completed: Whether completed tasks are counted.
+
+        Returns:
+            The range of rows, or None if the tasks would not be next to each
+            other in order of due date.
+        """
+        keys = sorted(
+            self.due_key(task)
+            for task in task_list
+            if include_completed or not task.completed
+        )
+        if not keys:
+            return range(0)
+        index = self._index(include_completed)
+        row = bisect_left(index, keys[0])
+        if row != bisect_left(index, keys[-1]):
+            return None
+        return range(row, row + len(keys))
+
+    def add(self, task: Task) -> None:
+        """Adds a task created by new_task to the store."""
+        key = self.due_key(task)
+        self._tasks_by_id[task.task_id] = task
+        self._due_keys[task.task_id] = key
+        insort(self._due_index, key)
+        insort(self._status_index[task.completed], key)
+        self._changed_tasks[task.task_id] = task
+        self._added_ids.add(task.task_id)
+        if self._search_index is not None:
+            self._search_index.add(task)
+
+    def add_all(self, task_list: list) -> None:
+        """Adds tasks created by new_task to the store together.
+
+        The tasks are sorted and merged into the indexes at once, rather than
+        inserted one at a time, so that adding many tasks takes linear time.
+
+        Args:
+            task_list: Tasks to add.
+        """
+        keys = []
+        for task in task_list:
+            key = self.due_key(task)
+            self._tasks_by_id[task.task_id] = task
+            self._due_keys[task.task_id] = key
+            self._changed_tasks[task.task_id] = task
+            self._added_ids.add(task.task_id)
+            keys.append(key)
+            if self._search_index is not None:
+                self._search_index.add(task)
+        self._merge_keys(keys)
+
+    def set_completed(self, task_id: int, completed: bool) -> None:
+        """Marks a task as complete/incomplete.
+
+        Args:
+            task_id: ID of the task to update.
+            completed: Whether the task has been completed.
+        """
+        task = self._tasks_by_id[task_id]
+        if task.completed == completed:
+            return
+
+        key = self._due_keys[task_id]
+        old_index = self._status_index[task.completed]
+        del old_index[bisect_left(old_index, key)]
+        insort(self._status_index[completed], key)
+        task.completed = completed
+        self._changed_tasks[task_id] = task
+
+    def set_completed_all(self, task_ids: list, completed: bool) -> None:
+        """Marks many tasks as complete/incomplete together.
+
+        The keys of the changed tasks are moved between the status indexes
+        at once, so that changing many tasks takes linear time.
+
+        Args:
+            task_ids: IDs of the tasks to update.
+            completed: Whether the tasks have been completed.
+        """
+        keys = []
+        for task_id in task_ids:
+            task = self._tasks_by_id[task_id]
+            if task.completed != completed:
+                task.completed = completed
+                self._changed_tasks[task_id] = task
+                keys.append(self._due_keys[task_id])
+
+        moved_keys = set(keys)
+        old_index = self._status_index[not completed]
+        old_index[:] = [key for key in old_index if key not in moved_keys]
+        keys.sort()
+        _merge(self._status_index[completed], keys)
+
+    def set_subject_all(self, task_ids: list, subject: str) -> None:
+        """Changes the subject of many tasks together.
+
+        Args:
+            task_ids: IDs of the tasks to update.
+            subject: Subject which the tasks are for.
+        """
+        subject = sys.intern(subject)
+        for task_id in task_ids:
+            task = self._tasks_by_id[task_id]
+            if task.subject == subject:
+                continue
+            if self._search_index is not None:
+                self._search_index.remove(task)
+            task.subject = subject
+            if self._search_index is not None:
+                self._search_index.add(task)
+            self._changed_tasks[task_id] = task
+            self._updated_ids.add(task_id)
+
+    def delete(self, task_id: int) -> None:
+        """Deletes a task from the store."""
+        task = self._tasks_by_id.pop(task_id)
+        key = self._due_keys.pop(task_id)
+        del self._due_index[bisect_left(self._due_index, key)]
+        status_index = self._status_index[task.completed]
+        del status_index[bisect_left(status_index, key)]
+        self._changed_tasks[task_id] = None
+        if self._search_index is not None:
+            self._search_index.remove(task)
+
+    def delete_all(self, task_ids: list) -> None:
+        """Deletes many tasks from the store together.
+
+        The indexes are filtered once, rather than the tasks being removed
+        from them one at a time, so that deleting many tasks takes linear
+        time.
+
+        Args:
+            task_ids: IDs of the tasks to delete.
+        """
+        task_ids = set(task_ids)
+        for task_id in task_ids:
+            task = self._tasks_by_id.pop(task_id)
+            del self._due_keys[task_id]
+            self._changed_tasks[task_id] = None
+            if self._search_index is not None:
+                self._search_index.remove(task)
+        self._due_index[:] = [key for key in self._due_index if key[1] not in task_ids]
+        for status_index in self._status_index.values():
+            status_index[:] = [key for key in status_index if key[1] not in task_ids]
+
+    def snapshot(self):
+        """Captures the changes made since they were last saved.
+
+        Only the rows of changed tasks are written to the SQLite database, and
+        only a record of each change is appended to the journal of the JSON
+        file. Once the journal passes the size threshold, the JSON file is
+        instead rewritten with all tasks in order of due date and the journal
+        is emptied, apart from the next ID. The IDs of the tasks are saved with
+        them, so that they stay the same.
+
+        Returns:
+            write: A function which writes the captured changes, which may be
+                   called on a background thread.
+            restore: A function which records the tasks as changed again if
+                     the write fails, so that they are saved next time.
+        """
+        compacting = False
+        if self.database is not None:
+            changed_tasks = {
+                task_id: None if task is None else replace(task)
+                for task_id, task in self._changed_tasks.items()
+            }
+            write = partial(self.database.write_tasks, changed_tasks, self._next_id)
+        else:
+            lines = "".join(
+                serializer.dumps(record) + "\n" for record in self._journal_records()
+            )
+            size = len(lines.encode("utf-8"))
+            if not self.loading and (
+                self._compaction_needed
+                or self._journal_size + size > COMPACTION_THRESHOLD
+            ):
+                task_list = [
+                    self._tasks_by_id[key[1]].to_json() for key in self._due_index
+                ]
+                contents = serializer.dumps(task_list)
+                write = partial(
+                    compact, self.path, contents, self.journal_path, self._next_id
+                )
+                compacting = True
+                self._journal_size = len(next_id_record(self._next_id))
+                self._compaction_needed = False
+            else:
+                write = partial(append_to_journal, self.journal_path, lines)
+                self._journal_size += size
+        restore = partial(
+            self._restore,
+            self._changed_tasks,
+            self._added_ids,
+            self._updated_ids,
+            compacting,
+        )
+        self._changed_tasks = {}
+        self._added_ids = set()
+        self._updated_ids = set()
+        return write, restore
+
+    def _restore(
+        self,
+        changed_tasks: dict,
+        added_ids: set,
+        updated_ids: set,
+        compacting: bool,
+    ) -> None:
+        """Records tasks whose save failed as changed again.
+
+        The tasks are saved in their latest state, so tasks which have
+        changed again since are left as they are. If the JSON file was being
+        rewritten, it is rewritten again on the next save.
+
+        Args:
+            changed_tasks: The changes which were captured, keyed by ID.
+            added_ids: IDs of the captured tasks which were added.
+            updated_ids: IDs of the captured tasks which were updated.
+            compacting: Whether the write was rewriting the JSON file.
+        """
+        for task_id in changed_tasks:
+            if task_id not in self._changed_tasks:
+                self._changed_tasks[task_id] = self._tasks_by_id.get(task_id)
+        self._added_ids |= added_ids
+        self._updated_ids |= updated_ids
+        self._journal_size = journal_size(self.journal_path)
+        if compacting:
+            self._compaction_needed = True
+
+    def _journal_records(self):
+        """Generates a journal record for each change made since the last save.
+
+        Yields:
+            The record of the latest state of each changed task.
+        """
+        for task_id, task in self._changed_tasks.items():
+            if task is None:
+                yield {"op": "delete", "id": task_id}
+            elif task_id in self._added_ids:
+                yield {"op": "add", "task": task.to_json()}
+            elif task_id in self._updated_ids:
+                yield {"op": "update", "task": task.to_json()}
+            else:
+                operation = "complete" if task.completed else "uncomplete"
+                yield {"op": operation, "id": task_id}
+
+    def save(self) -> None:
+        """Saves the tasks which have changed since they were last saved."""
+        if self._changed_tasks or (self._compaction_needed and not self.loading):
+            with timed("agenda.save"):
+                write, _ = self.snapshot()
+                write()
+
+
+def _merge(index: list, keys: list) -> None:
+    """Merges sorted keys into a sorted index.
+
+    Args:
+        index: Sorted list of keys to merge the keys into.
+        keys: Sorted list of keys which are not in the index.
+    """
+    if not keys:
+        return
+    row = bisect_left(index, keys[0])
+    if row == bisect_left(index, keys[-1]):
+        index[row:row] = keys
+    else:
+        index.extend(keys)
+        index.sort()
+
+
+def compact(path: str, contents: str, journal_path: str, next_id: int) -> None:
+    """Rewrites the JSON file with all tasks and then empties the journal.
+
+    Args:
+        path: Path of the JSON file.
+        contents: JSON of all tasks.
+        journal_path: Path of the journal, whose records are all in contents.
+        next_id: ID to give the next new task, which is kept in the journal.
+    """
+    write_atomically(path, contents)
+    reset_journal(journal_path, next_id)
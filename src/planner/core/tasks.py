@@ -0,0 +1,117 @@
+"""The service which reads the tasks in the agenda into a task store.
+
+The tasks are read from the SQLite database, if it is enabled, or otherwise
+from the task list JSON file with the changes in its journal replayed on top.
+Large JSON files can be read in chunks, so that the first tasks can be used
+before the rest have been read.
+"""
+
+import logging
+
+from planner.core import serializer
+from planner.core.database import open_database
+from planner.core.instrumentation import timed
+from planner.core.records import Task
+from planner.core.task_journal import JOURNAL_PATH, JournalReplay, read_journal
+from planner.core.task_store import TASK_LIST_PATH, TaskStore
+
+logger = logging.getLogger(__name__)
+
+# Number of tasks read at a time, which is enough to fill the first page of
+# the agenda.
+TASK_CHUNK_SIZE = 1000
+
+
+def read_task_chunks(replay: JournalReplay = None, chunk_size: int = TASK_CHUNK_SIZE):
+    """Reads the tasks in the JSON file incrementally, in chunks.
+
+    The changes recorded in the journal since the JSON file was last written
+    are applied to each chunk as it is read.
+
+    Args:
+        replay: The changes read from the journal, or None to read them.
+        chunk_size: Number of tasks to read from the JSON file in each chunk.
+
+    Yields:
+        Lists of the tasks in the order they were saved in the JSON file,
+        followed by the tasks added since it was written.
+    """
+    if replay is None:
+        replay = JournalReplay(read_journal(JOURNAL_PATH))
+    chunk = []
+    try:
+        for task in serializer.iter_array(TASK_LIST_PATH):
+            chunk.append(Task.from_json(task))
+            if len(chunk) == chunk_size:
+                yield replay.apply(chunk)
+                chunk = []
+    except ValueError:
+        logger.warning("Empty or invalid JSON file: %s", TASK_LIST_PATH)
+    yield replay.apply(chunk) + list(replay.added_tasks.values())
+
+
+def read_tasks() -> list:
+    """Reads the existing JSON file for the list of tasks.
+
+    The changes recorded in the journal since the JSON file was last written
+    are replayed on top of it.
+
+    Returns:
+        task_list: A list of all tasks.
+    """
+    task_list = [task for chunk in read_task_chunks() for task in chunk]
+    logger.debug("Read %d tasks", len(task_list))
+    return task_list
+
+
+def open_task_store() -> TaskStore:
+    """Opens the store of all tasks from the SQLite database if it is enabled.
+
+    Otherwise, the tasks are read from the JSON file and its journal.
+
+    Returns:
+        The store of the tasks in the agenda.
+    """
+    database = open_database()
+    with timed("agenda.load"):
+        if database is not None:
+            return TaskStore(
+                database.read_tasks(), database, next_id=database.read_next_task_id()
+            )
+
+        replay = JournalReplay(read_journal(JOURNAL_PATH))
+        task_list = [task for chunk in read_task_chunks(replay) for task in chunk]
+    return TaskStore(task_list, next_id=replay.next_id)
+
+
+def open_task_store_in_chunks() -> tuple:
+    """Opens the store of tasks, reading only the first chunk of the JSON file.
+
+    The rest of the tasks can then be read without delaying the display of the
+    first page of the agenda. The SQLite database, if it is enabled, is read
+    all at once.
+
+    Returns:
+        The store of the tasks in the agenda, and an iterator over the chunks
+        of tasks which are still to be read, or None if all have been read.
+    """
+    database = open_database()
+    with timed("agenda.load"):
+        if database is not None:
+            task_store = TaskStore(
+                database.read_tasks(), database, next_id=database.read_next_task_id()
+            )
+            return task_store, None
+
+        replay = JournalReplay(read_journal(JOURNAL_PATH))
+        task_chunks = read_task_chunks(replay)
+        task_list = next(task_chunks)
+        # Tasks saved before IDs were introduced are given their IDs as they
+        # are stored, so they must all be read before any are changed.
+        if any(task.task_id is None for task in task_list):
+            task_list += [task for chunk in task_chunks for task in chunk]
+            task_chunks = None
+
+    task_store = TaskStore(task_list, next_id=replay.next_id)
+    task_store.loading = task_chunks is not None
+    return task_store, task_chunks
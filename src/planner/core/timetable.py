@@ -0,0 +1,41 @@
+"""The service which opens the timetable of lessons from where it is saved.
+
+The timetable is read from the SQLite database, if it is enabled, or otherwise
+from the memory-mapped timetable file.
+"""
+
+from planner.core.database import open_database
+from planner.core.instrumentation import timed
+from planner.core.timetable_file import open_timetable_file
+from planner.core.timetable_grid import (
+    DEFAULT_DIMENSIONS,
+    Timetable,
+    configured_dimensions,
+)
+
+
+def open_timetable() -> Timetable:
+    """Opens the timetable from the SQLite database if it is enabled.
+
+    Otherwise, the timetable is read from the timetable file. The dimensions
+    chosen with the STUDENT_PLANNER_TIMETABLE environment variable are saved,
+    and otherwise the timetable keeps the dimensions it was last saved with.
+
+    Returns:
+        The timetable of lessons.
+    """
+    dimensions = configured_dimensions()
+    database = open_database()
+    with timed("timetable.load"):
+        if database is not None:
+            lesson_store = database
+            if dimensions is None:
+                dimensions = database.read_timetable_dimensions()
+            else:
+                database.write_timetable_dimensions(dimensions)
+        else:
+            lesson_store = open_timetable_file(dimensions=dimensions)
+            dimensions = lesson_store.dimensions
+        lessons = lesson_store.read_lessons()
+
+    return Timetable(lessons, dimensions or DEFAULT_DIMENSIONS, lesson_store)
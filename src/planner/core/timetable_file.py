@@ -0,0 +1,324 @@
+"""A binary file which stores the lessons in the timetable.
+
+Every timetable slot has a record of the same size at a fixed position in the
+file, which is accessed through a memory map, so that editing a slot writes
+only its record in place rather than rewriting the whole file. The names of
+subjects, teachers, and rooms are kept once each in a string table at the end
+of the file, which the records refer to by ID.
+
+The file is laid out as:
+
+    header: b"SPTT", the version of the format, the numbers of weeks, days,
+            and periods which the file has records for, and the numbers of
+            weeks, days, and periods which are displayed.
+    records: The IDs of the subject, teacher, and room strings of each slot,
+             in order of week, then period, then day.
+    string table: The length of each string in bytes, followed by the string
+                  encoded as UTF-8. The string with ID 0 is the empty string,
+                  so a record of zeros is an empty slot.
+
+New strings are appended to the string table, and reach the disk before any
+record refers to them, so that the file is never left with a record referring
+to a string which is missing. A partly written string at the end of the file
+is discarded when the file is next opened.
+
+Making the timetable smaller only changes the displayed dimensions, so the
+lessons in the slots which are no longer displayed are kept, and come back if
+the timetable is made larger again. Version 1 of the format had no displayed
+dimensions, and displayed all of its records.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+
+from planner.core import serializer
+from planner.core.records import Lesson
+from planner.core.storage import write_atomically
+from planner.core.timetable_grid import DEFAULT_DIMENSIONS, Dimensions, legacy_slot_key
+
+logger = logging.getLogger(__name__)
+
+TIMETABLE_FILE_PATH = "resources/timetable.bin"
+TIMETABLE_JSON_PATH = "resources/timetable.json"
+
+MAGIC = b"SPTT"
+VERSION = 2
+HEADER = struct.Struct("<4sHHHH")
+DISPLAYED_DIMENSIONS = struct.Struct("<HHH")
+RECORD = struct.Struct("<III")
+STRING_LENGTH = struct.Struct("<H")
+
+# Number of unused strings which may be left in the string table before the
+# file is rewritten without them.
+UNUSED_STRING_LIMIT = 64
+
+
+def open_timetable_file(
+    path: str = TIMETABLE_FILE_PATH,
+    json_path: str = TIMETABLE_JSON_PATH,
+    dimensions: Dimensions = None,
+) -> "TimetableFile":
+    """Opens the timetable file, creating it if it does not exist yet.
+
+    A new timetable file is given the lessons in the JSON file which stored
+    the timetable before the binary file was introduced, if there is one.
+
+    Args:
+        path: Path of the timetable file.
+        json_path: Path of the JSON file to copy the lessons from.
+        dimensions: Dimensions to display the timetable with, or None to keep
+                    the dimensions of the file.
+
+    Returns:
+        The opened timetable file.
+    """
+    if not os.path.exists(path):
+        lessons = {}
+        if os.path.exists(json_path):
+            try:
+                lessons = {
+                    legacy_slot_key(slot): Lesson.from_json(lesson)
+                    for slot, lesson in enumerate(serializer.load_file(json_path))
+                }
+            except ValueError:
+                logger.warning("Empty JSON file: %s", json_path)
+        TimetableFile.create(path, lessons, dimensions or DEFAULT_DIMENSIONS)
+
+    timetable_file = TimetableFile(path)
+    resized = dimensions is not None and dimensions != timetable_file.dimensions
+    # Rewrites the file with records for more slots, or without the strings
+    # which are no longer used. A smaller timetable only hides slots.
+    if (resized and not timetable_file.can_display(dimensions)) or (
+        timetable_file.unused_string_count() > UNUSED_STRING_LIMIT
+    ):
+        dimensions = dimensions or timetable_file.dimensions
+        lessons = timetable_file.read_lessons()
+        timetable_file.close()
+        TimetableFile.create(path, lessons, dimensions)
+        timetable_file = TimetableFile(path)
+    elif resized:
+        timetable_file.display(dimensions)
+    return timetable_file
+
+
+class TimetableFile:
+    """Reads and writes the lessons in a binary timetable file.
+
+    The lessons may be written by the background thread which saves changes,
+    so each write holds the lock.
+
+    Attributes:
+        dimensions: Numbers of weeks, days, and periods which are displayed.
+        extent: Numbers of weeks, days, and periods which the file has
+                records for, which may be more than are displayed.
+        lock: Lock which must be held to write to the file.
+        path: Path of the timetable file.
+        version: Version of the format of the file.
+    """
+
+    def __init__(self, path: str = TIMETABLE_FILE_PATH) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self._file = open(path, "r+b")
+        magic, version, *extent = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC or version not in (1, VERSION):
+            self._file.close()
+            raise ValueError(f"Not a timetable file: {path}")
+
+        self.version = version
+        self.extent = Dimensions(*extent)
+        if version == 1:
+            self.dimensions = self.extent
+            self._records_start = HEADER.size
+        else:
+            self.dimensions = Dimensions(
+                *DISPLAYED_DIMENSIONS.unpack(self._file.read(DISPLAYED_DIMENSIONS.size))
+            )
+            self._records_start = HEADER.size + DISPLAYED_DIMENSIONS.size
+        records_end = self._records_start + self.extent.slot_count * RECORD.size
+        self._map = mmap.mmap(self._file.fileno(), records_end)
+        self._file.seek(records_end)
+        self._strings = _read_string_table(self._file, path)
+        self._string_ids = {
+            text: string_id for string_id, text in enumerate(self._strings)
+        }
+
+    @staticmethod
+    def create(
+        path: str, lessons: dict, dimensions: Dimensions = DEFAULT_DIMENSIONS
+    ) -> None:
+        """Writes a new timetable file in a single step.
+
+        The file has records for all of the lessons, including those outside
+        the dimensions of the timetable, which are hidden. Empty lessons, such
+        as the blank lessons which older files kept in free slots, are left
+        as free slots.
+
+        Args:
+            path: Path of the timetable file.
+            lessons: Lessons keyed by the (week, day, period) of their slot.
+            dimensions: Numbers of weeks, days, and periods to display.
+        """
+        lessons = {
+            key: lesson for key, lesson in lessons.items() if not lesson.is_empty()
+        }
+        extent = Dimensions(
+            *(
+                max([size] + [key[axis] + 1 for key in lessons])
+                for axis, size in enumerate(dimensions)
+            )
+        )
+        strings = [""]
+        string_ids = {"": 0}
+        records = bytearray(extent.slot_count * RECORD.size)
+        for key, lesson in lessons.items():
+            ids = []
+            for text in (lesson.subject, lesson.teacher, lesson.room):
+                if text not in string_ids:
+                    string_ids[text] = len(strings)
+                    strings.append(text)
+                ids.append(string_ids[text])
+            RECORD.pack_into(records, _slot(extent, key) * RECORD.size, *ids)
+
+        contents = HEADER.pack(MAGIC, VERSION, *extent)
+        contents += DISPLAYED_DIMENSIONS.pack(*dimensions) + records
+        contents += b"".join(_encode_string(text) for text in strings)
+        write_atomically(path, contents)
+
+    def close(self) -> None:
+        """Closes the timetable file."""
+        with self.lock:
+            self._map.close()
+            self._file.close()
+
+    def can_display(self, dimensions: Dimensions) -> bool:
+        """Checks whether the file has records for all slots of a timetable."""
+        return self.version == VERSION and all(
+            size <= extent_size for size, extent_size in zip(dimensions, self.extent)
+        )
+
+    def display(self, dimensions: Dimensions) -> None:
+        """Changes the dimensions which are displayed, in place.
+
+        Args:
+            dimensions: Numbers of weeks, days, and periods to display, which
+                        the file must be able to display.
+        """
+        with self.lock:
+            DISPLAYED_DIMENSIONS.pack_into(self._map, HEADER.size, *dimensions)
+            self._map.flush()
+        self.dimensions = dimensions
+
+    def unused_string_count(self) -> int:
+        """Counts the strings which are no longer used by any slot."""
+        with self.lock:
+            used_ids = {string_id for record in self._records() for string_id in record}
+        return len(self._strings) - len(used_ids)
+
+    def _records(self):
+        """Generates the string IDs in the record of each slot."""
+        return RECORD.iter_unpack(self._map[self._records_start :])
+
+    def read_lessons(self) -> dict:
+        """Reads the lessons in each occupied timetable slot.
+
+        The lessons in slots which are not displayed are included.
+
+        Returns:
+            Lessons keyed by the (week, day, period) of their slot.
+        """
+        strings = self._strings
+        lessons = {}
+        with self.lock:
+            for slot, (subject, teacher, room) in enumerate(self._records()):
+                if subject or teacher or room:
+                    lessons[_key(self.extent, slot)] = Lesson(
+                        sys.intern(strings[subject]), strings[teacher], strings[room]
+                    )
+        return lessons
+
+    def write_lessons(self, changed_lessons: dict) -> None:
+        """Writes the records of changed timetable slots in place.
+
+        Args:
+            changed_lessons: Changed lessons keyed by the (week, day, period)
+                             of their slot.
+        """
+        with self.lock:
+            new_strings = bytearray()
+            records = []
+            for key, lesson in changed_lessons.items():
+                ids = []
+                for text in (lesson.subject, lesson.teacher, lesson.room):
+                    if text not in self._string_ids:
+                        self._string_ids[text] = len(self._strings)
+                        self._strings.append(text)
+                        new_strings += _encode_string(text)
+                    ids.append(self._string_ids[text])
+                records.append((_slot(self.extent, key), ids))
+
+            # New strings reach the disk before the records which use them.
+            if new_strings:
+                self._file.seek(0, os.SEEK_END)
+                self._file.write(new_strings)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+            for slot, ids in records:
+                RECORD.pack_into(
+                    self._map, self._records_start + slot * RECORD.size, *ids
+                )
+            self._map.flush()
+
+
+def _slot(dimensions: Dimensions, key: tuple) -> int:
+    """Finds the position of the record of a slot in the file.
+
+    The records are in order of week, then period, then day, as in the rows
+    of the timetable.
+    """
+    week, day, period = key
+    return (week * dimensions.periods + period) * dimensions.days + day
+
+
+def _key(dimensions: Dimensions, slot: int) -> tuple:
+    """Finds the (week, day, period) of the slot with a record position."""
+    rest, day = divmod(slot, dimensions.days)
+    week, period = divmod(rest, dimensions.periods)
+    return week, day, period
+
+
+def _encode_string(text: str) -> bytes:
+    """Encodes a string as an entry in the string table."""
+    encoded = text.encode("utf-8")
+    return STRING_LENGTH.pack(len(encoded)) + encoded
+
+
+def _read_string_table(data_file, path: str) -> list:
+    """Reads the strings from the current position to the end of the file.
+
+    A partly written string at the end of the file is truncated.
+
+    Returns:
+        strings: A list of the strings in order of ID.
+    """
+    start = data_file.tell()
+    table = data_file.read()
+    strings = []
+    position = 0
+    while position + STRING_LENGTH.size <= len(table):
+        (length,) = STRING_LENGTH.unpack_from(table, position)
+        end = position + STRING_LENGTH.size + length
+        if end > len(table):
+            break
+        strings.append(table[position + STRING_LENGTH.size : end].decode("utf-8"))
+        position = end
+
+    if position < len(table):
+        logger.warning("Discarding partly written string at the end of %s", path)
+        data_file.truncate(start + position)
+    return strings or [""]
@@ -0,0 +1,210 @@
+"""A timetable of lessons with any number of days, periods, and weeks.
+
+A timetable has a number of days in each week and periods in each day, and may
+rotate through several weeks, as in a two-week A/B timetable. Only occupied
+slots are stored, in a dictionary keyed by (week, day, period), so the memory
+used and the time taken to display a timetable depend on the number of lessons
+rather than on the size of the grid.
+
+The dimensions of the timetable are chosen with the STUDENT_PLANNER_TIMETABLE
+environment variable, in the format WEEKSxDAYSxPERIODS (for example, "2x5x10"
+for a two-week timetable of five days with ten periods each). Otherwise, the
+timetable keeps the dimensions that it was last saved with, which are one week
+of five days with five periods each by default.
+"""
+
+import os
+from functools import partial
+from typing import NamedTuple
+
+from planner.core.records import EMPTY_LESSON, Lesson
+
+DAY_NAMES = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
+
+
+class Dimensions(NamedTuple):
+    """The size of a timetable.
+
+    Attributes:
+        weeks: Number of weeks which the timetable rotates through.
+        days: Number of days in each week.
+        periods: Number of periods in each day.
+    """
+
+    weeks: int
+    days: int
+    periods: int
+
+    @property
+    def slot_count(self) -> int:
+        """Counts the slots in the timetable."""
+        return self.weeks * self.days * self.periods
+
+    def contains(self, key: tuple) -> bool:
+        """Checks whether a (week, day, period) key is within the timetable."""
+        week, day, period = key
+        return (
+            0 <= week < self.weeks
+            and 0 <= day < self.days
+            and 0 <= period < self.periods
+        )
+
+    def __str__(self) -> str:
+        return f"{self.weeks}x{self.days}x{self.periods}"
+
+
+DEFAULT_DIMENSIONS = Dimensions(1, 5, 5)
+
+
+def parse_dimensions(text: str) -> Dimensions:
+    """Parses the dimensions of a timetable.
+
+    Args:
+        text: Dimensions in the format WEEKSxDAYSxPERIODS, such as "2x5x10".
+
+    Returns:
+        The dimensions of the timetable.
+
+    Raises:
+        ValueError: The text is not in the right format, or a dimension is
+                    not between 1 and 65535.
+    """
+    parts = text.lower().split("x")
+    if len(parts) != 3:
+        raise ValueError(f"Expected WEEKSxDAYSxPERIODS, not {text!r}")
+    dimensions = Dimensions(*(int(part) for part in parts))
+    if not all(1 <= size <= 0xFFFF for size in dimensions):
+        raise ValueError(f"Timetable dimensions out of range: {text!r}")
+    return dimensions
+
+
+def configured_dimensions():
+    """Gets the dimensions chosen with the environment variable, if any.
+
+    Returns:
+        The dimensions of the timetable, or None if they were not chosen.
+    """
+    text = os.environ.get("STUDENT_PLANNER_TIMETABLE")
+    return parse_dimensions(text) if text else None
+
+
+def week_name(week: int) -> str:
+    """Names a week of the timetable, such as "Week A"."""
+    return f"Week {chr(ord('A') + week)}" if week < 26 else f"Week {week + 1}"
+
+
+def day_name(day: int) -> str:
+    """Names a day of the timetable, such as "Monday"."""
+    return DAY_NAMES[day] if day < len(DAY_NAMES) else f"Day {day + 1}"
+
+
+def period_name(period: int) -> str:
+    """Names a period of the timetable, such as "Period 1"."""
+    return f"Period {period + 1}"
+
+
+def legacy_slot_key(slot: int) -> tuple:
+    """Converts the index of a slot in the original 5x5 timetable to its key.
+
+    The original timetable listed the slots period by period, with the five
+    days of each period in order.
+    """
+    period, day = divmod(slot, 5)
+    return 0, day, period
+
+
+class Timetable:
+    """Stores the lessons in the occupied slots of a timetable.
+
+    Changes are recorded until they are saved, so that only the changed slots
+    are written to the lesson store.
+
+    Attributes:
+        dimensions: Numbers of weeks, days, and periods in the timetable.
+        lesson_store: SQLite database or timetable file which the lessons are
+                      saved to.
+        lessons: Lessons in the occupied slots, keyed by (week, day, period).
+    """
+
+    def __init__(
+        self, lessons: dict, dimensions: Dimensions, lesson_store=None
+    ) -> None:
+        self.dimensions = dimensions
+        self.lesson_store = lesson_store
+        self._changed_lessons = {}
+
+        # Slots outside the timetable are not displayed, but the lesson store
+        # keeps their lessons in case the timetable is made larger again.
+        self.lessons = {
+            key: lesson
+            for key, lesson in lessons.items()
+            if dimensions.contains(key) and not lesson.is_empty()
+        }
+
+    def __len__(self) -> int:
+        return len(self.lessons)
+
+    def get(self, key: tuple) -> Lesson:
+        """Gets the lesson in a slot, which is the empty lesson if it is free."""
+        return self.lessons.get(key, EMPTY_LESSON)
+
+    def set(self, key: tuple, lesson: Lesson) -> None:
+        """Puts a lesson in a slot, or frees the slot for an empty lesson.
+
+        Args:
+            key: The (week, day, period) of the slot.
+            lesson: The lesson to put in the slot.
+        """
+        if not self.dimensions.contains(key):
+            raise KeyError(f"Slot {key} is not in a {self.dimensions} timetable")
+        if lesson.is_empty():
+            self.lessons.pop(key, None)
+            lesson = EMPTY_LESSON
+        else:
+            self.lessons[key] = lesson
+        self._changed_lessons[key] = lesson
+
+    def clear(self, key: tuple) -> None:
+        """Frees a slot of the timetable."""
+        self.set(key, EMPTY_LESSON)
+
+    def week_lessons(self, week: int):
+        """Generates the lessons in the occupied slots of a week.
+
+        Yields:
+            The day, period, and lesson of each occupied slot.
+        """
+        for (lesson_week, day, period), lesson in self.lessons.items():
+            if lesson_week == week:
+                yield day, period, lesson
+
+    def snapshot(self):
+        """Captures the changes made since they were last saved.
+
+        Returns:
+            write: A function which writes only the changed slots to the
+                   lesson store, which may be called on a background thread.
+            restore: A function which records the slots as changed again if
+                     the write fails, so that they are saved next time.
+        """
+        write = partial(self.lesson_store.write_lessons, self._changed_lessons)
+        restore = partial(self._restore, self._changed_lessons)
+        self._changed_lessons = {}
+        return write, restore
+
+    def _restore(self, changed_lessons: dict) -> None:
+        """Records slots whose save failed as changed again.
+
+        Slots which have changed again since are left as they are, so that
+        their latest lesson is saved.
+        """
+        for key, lesson in changed_lessons.items():
+            self._changed_lessons.setdefault(key, lesson)
@@ -44,6 +44,12 @@ class Ui_mwindow_agenda(object):
         self.btn_complete_task = QtWidgets.QPushButton(self.central_widget)
         self.btn_complete_task.setObjectName("btn_complete_task")
         self.hori_layout_buttons.addWidget(self.btn_complete_task, 0, QtCore.Qt.AlignLeft)
+        self.btn_uncomplete_task = QtWidgets.QPushButton(self.central_widget)
+        self.btn_uncomplete_task.setObjectName("btn_uncomplete_task")
+        self.hori_layout_buttons.addWidget(self.btn_uncomplete_task, 0, QtCore.Qt.AlignLeft)
+        self.btn_change_subject = QtWidgets.QPushButton(self.central_widget)
+        self.btn_change_subject.setObjectName("btn_change_subject")
+        self.hori_layout_buttons.addWidget(self.btn_change_subject, 0, QtCore.Qt.AlignLeft)
         self.btn_delete_task = QtWidgets.QPushButton(self.central_widget)
         self.btn_delete_task.setObjectName("btn_delete_task")
         self.hori_layout_buttons.addWidget(self.btn_delete_task, 0, QtCore.Qt.AlignLeft)
@@ -52,13 +58,40 @@ class Ui_mwindow_agenda(object):
         self.btn_hide_completed = QtWidgets.QPushButton(self.central_widget)
         self.btn_hide_completed.setObjectName("btn_hide_completed")
         self.hori_layout_buttons.addWidget(self.btn_hide_completed, 0, QtCore.Qt.AlignLeft)
+        self.btn_show_history = QtWidgets.QPushButton(self.central_widget)
+        self.btn_show_history.setObjectName("btn_show_history")
+        self.hori_layout_buttons.addWidget(self.btn_show_history, 0, QtCore.Qt.AlignLeft)
         self.vert_layout_agenda.addLayout(self.hori_layout_buttons)
         self.hori_line_add_task = QtWidgets.QFrame(self.central_widget)
         self.hori_line_add_task.setFrameShape(QtWidgets.QFrame.HLine)
         self.hori_line_add_task.setFrameShadow(QtWidgets.QFrame.Sunken)
         self.hori_line_add_task.setObjectName("hori_line_add_task")
         self.vert_layout_agenda.addWidget(self.hori_line_add_task)
-        self.table_widget_task_list = QtWidgets.QTableWidget(self.central_widget)
+        self.hori_layout_search = QtWidgets.QHBoxLayout()
+        self.hori_layout_search.setObjectName("hori_layout_search")
+        self.comb_box_view = QtWidgets.QComboBox(self.central_widget)
+        self.comb_box_view.setObjectName("comb_box_view")
+        self.hori_layout_search.addWidget(self.comb_box_view)
+        self.date_edit_first = QtWidgets.QDateEdit(self.central_widget)
+        self.date_edit_first.setCalendarPopup(True)
+        self.date_edit_first.setObjectName("date_edit_first")
+        self.hori_layout_search.addWidget(self.date_edit_first)
+        self.date_edit_last = QtWidgets.QDateEdit(self.central_widget)
+        self.date_edit_last.setCalendarPopup(True)
+        self.date_edit_last.setObjectName("date_edit_last")
+        self.hori_layout_search.addWidget(self.date_edit_last)
+        self.line_edit_search = QtWidgets.QLineEdit(self.central_widget)
+        self.line_edit_search.setClearButtonEnabled(True)
+        self.line_edit_search.setObjectName("line_edit_search")
+        self.hori_layout_search.addWidget(self.line_edit_search)
+        self.comb_box_filter_subject = QtWidgets.QComboBox(self.central_widget)
+        self.comb_box_filter_subject.setObjectName("comb_box_filter_subject")
+        self.hori_layout_search.addWidget(self.comb_box_filter_subject)
+        self.btn_clear_search = QtWidgets.QPushButton(self.central_widget)
+        self.btn_clear_search.setObjectName("btn_clear_search")
+        self.hori_layout_search.addWidget(self.btn_clear_search)
+        self.vert_layout_agenda.addLayout(self.hori_layout_search)
+        self.table_view_task_list = QtWidgets.QTableView(self.central_widget)
         palette = QtGui.QPalette()
         brush = QtGui.QBrush(QtGui.QColor(0, 0, 0, 0))
         brush.setStyle(QtCore.Qt.SolidPattern)
@@ -87,40 +120,30 @@ class Ui_mwindow_agenda(object):
         brush = QtGui.QBrush(QtGui.QColor(0, 0, 0, 0))
         brush.setStyle(QtCore.Qt.SolidPattern)
         palette.setBrush(QtGui.QPalette.Disabled, QtGui.QPalette.Window, brush)
-        self.table_widget_task_list.setPalette(palette)
+        self.table_view_task_list.setPalette(palette)
         font = QtGui.QFont()
         font.setFamily("Arial")
         font.setPointSize(10)
-        self.table_widget_task_list.setFont(font)
-        self.table_widget_task_list.setAutoFillBackground(False)
-        self.table_widget_task_list.setStyleSheet("background-color: transparent")
-        self.table_widget_task_list.setFrameShape(QtWidgets.QFrame.NoFrame)
-        self.table_widget_task_list.setLineWidth(0)
-        self.table_widget_task_list.setSizeAdjustPolicy(QtWidgets.QAbstractScrollArea.AdjustToContents)
-        self.table_widget_task_list.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
-        self.table_widget_task_list.setTabKeyNavigation(False)
-        self.table_widget_task_list.setProperty("showDropIndicator", True)
-        self.table_widget_task_list.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
-        self.table_widget_task_list.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        self.table_widget_task_list.setShowGrid(False)
-        self.table_widget_task_list.setCornerButtonEnabled(False)
-        self.table_widget_task_list.setObjectName("table_widget_task_list")
-        self.table_widget_task_list.setColumnCount(4)
-        self.table_widget_task_list.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        item.setBackground(QtGui.QColor(0, 0, 0, 0))
-        self.table_widget_task_list.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.table_widget_task_list.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.table_widget_task_list.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.table_widget_task_list.setHorizontalHeaderItem(3, item)
-        self.table_widget_task_list.horizontalHeader().setVisible(True)
-        self.table_widget_task_list.horizontalHeader().setHighlightSections(True)
-        self.table_widget_task_list.horizontalHeader().setStretchLastSection(False)
-        self.table_widget_task_list.verticalHeader().setVisible(True)
-        self.vert_layout_agenda.addWidget(self.table_widget_task_list)
+        self.table_view_task_list.setFont(font)
+        self.table_view_task_list.setAutoFillBackground(False)
+        self.table_view_task_list.setStyleSheet("background-color: transparent")
+        self.table_view_task_list.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.table_view_task_list.setLineWidth(0)
+        self.table_view_task_list.setSizeAdjustPolicy(QtWidgets.QAbstractScrollArea.AdjustToContents)
+        self.table_view_task_list.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table_view_task_list.setTabKeyNavigation(False)
+        self.table_view_task_list.setProperty("showDropIndicator", True)
+        self.table_view_task_list.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.table_view_task_list.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table_view_task_list.setShowGrid(False)
+        self.table_view_task_list.setSortingEnabled(True)
+        self.table_view_task_list.setCornerButtonEnabled(False)
+        self.table_view_task_list.setObjectName("table_view_task_list")
+        self.table_view_task_list.horizontalHeader().setVisible(True)
+        self.table_view_task_list.horizontalHeader().setHighlightSections(True)
+        self.table_view_task_list.horizontalHeader().setStretchLastSection(False)
+        self.table_view_task_list.verticalHeader().setVisible(True)
+        self.vert_layout_agenda.addWidget(self.table_view_task_list)
         self.gridLayout.addLayout(self.vert_layout_agenda, 0, 0, 1, 1)
         mwindow_agenda.setCentralWidget(self.central_widget)
         self.action_open_my_subjects = QtWidgets.QAction(mwindow_agenda)
@@ -134,18 +157,17 @@ class Ui_mwindow_agenda(object):
         mwindow_agenda.setWindowTitle(_translate("mwindow_agenda", "Agenda"))
         self.lbl_agenda.setText(_translate("mwindow_agenda", "Agenda"))
         self.btn_add_task.setText(_translate("mwindow_agenda", "Add Task"))
-        self.btn_complete_task.setText(_translate("mwindow_agenda", "Mark as Complete/Incomplete"))
+        self.btn_complete_task.setText(_translate("mwindow_agenda", "Mark as Complete"))
+        self.btn_uncomplete_task.setText(_translate("mwindow_agenda", "Mark as Incomplete"))
+        self.btn_change_subject.setText(_translate("mwindow_agenda", "Change Subject"))
         self.btn_delete_task.setText(_translate("mwindow_agenda", "Delete Task"))
         self.btn_hide_completed.setText(_translate("mwindow_agenda", "Hide/Show Completed Tasks"))
-        self.table_widget_task_list.setSortingEnabled(True)
-        item = self.table_widget_task_list.horizontalHeaderItem(0)
-        item.setText(_translate("mwindow_agenda", "Task Title"))
-        item = self.table_widget_task_list.horizontalHeaderItem(1)
-        item.setText(_translate("mwindow_agenda", "Subject"))
-        item = self.table_widget_task_list.horizontalHeaderItem(2)
-        item.setText(_translate("mwindow_agenda", "Due Date"))
-        item = self.table_widget_task_list.horizontalHeaderItem(3)
-        item.setText(_translate("mwindow_agenda", "Completed"))
+        self.btn_show_history.setText(_translate("mwindow_agenda", "Show History"))
+        self.date_edit_first.setDisplayFormat(_translate("mwindow_agenda", "dd/MM/yyyy"))
+        self.date_edit_last.setDisplayFormat(_translate("mwindow_agenda", "dd/MM/yyyy"))
+        self.line_edit_search.setPlaceholderText(_translate("mwindow_agenda", "Search tasks"))
+        self.comb_box_filter_subject.setPlaceholderText(_translate("mwindow_agenda", "All Subjects"))
+        self.btn_clear_search.setText(_translate("mwindow_agenda", "Clear Search"))
         self.action_open_my_subjects.setText(_translate("mwindow_agenda", "Open My Subjects"))
         self.action_open_my_subjects.setShortcut(_translate("mwindow_agenda", "Ctrl+1"))
 
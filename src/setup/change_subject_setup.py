@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'change_subject.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.2
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_dialog_change_subject(object):
+    def setupUi(self, dialog_change_subject):
+        dialog_change_subject.setObjectName("dialog_change_subject")
+        dialog_change_subject.resize(400, 170)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(10)
+        dialog_change_subject.setFont(font)
+        self.vert_layout_change_subject = QtWidgets.QVBoxLayout(dialog_change_subject)
+        self.vert_layout_change_subject.setObjectName("vert_layout_change_subject")
+        self.lbl_change_subject = QtWidgets.QLabel(dialog_change_subject)
+        font = QtGui.QFont()
+        font.setPointSize(14)
+        self.lbl_change_subject.setFont(font)
+        self.lbl_change_subject.setObjectName("lbl_change_subject")
+        self.vert_layout_change_subject.addWidget(self.lbl_change_subject)
+        self.hori_line_change_subject = QtWidgets.QFrame(dialog_change_subject)
+        self.hori_line_change_subject.setFrameShape(QtWidgets.QFrame.HLine)
+        self.hori_line_change_subject.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.hori_line_change_subject.setObjectName("hori_line_change_subject")
+        self.vert_layout_change_subject.addWidget(self.hori_line_change_subject)
+        self.hori_layout_subject = QtWidgets.QHBoxLayout()
+        self.hori_layout_subject.setObjectName("hori_layout_subject")
+        self.lbl_subject = QtWidgets.QLabel(dialog_change_subject)
+        self.lbl_subject.setObjectName("lbl_subject")
+        self.hori_layout_subject.addWidget(self.lbl_subject)
+        self.comb_box_subject = QtWidgets.QComboBox(dialog_change_subject)
+        self.comb_box_subject.setObjectName("comb_box_subject")
+        self.hori_layout_subject.addWidget(self.comb_box_subject)
+        self.vert_layout_change_subject.addLayout(self.hori_layout_subject)
+        self.lbl_instruction = QtWidgets.QLabel(dialog_change_subject)
+        font = QtGui.QFont()
+        font.setItalic(True)
+        self.lbl_instruction.setFont(font)
+        self.lbl_instruction.setObjectName("lbl_instruction")
+        self.vert_layout_change_subject.addWidget(self.lbl_instruction)
+        self.button_box_change_subject = QtWidgets.QDialogButtonBox(dialog_change_subject)
+        self.button_box_change_subject.setOrientation(QtCore.Qt.Horizontal)
+        self.button_box_change_subject.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Save)
+        self.button_box_change_subject.setObjectName("button_box_change_subject")
+        self.vert_layout_change_subject.addWidget(self.button_box_change_subject, 0, QtCore.Qt.AlignLeft|QtCore.Qt.AlignTop)
+
+        self.retranslateUi(dialog_change_subject)
+        self.button_box_change_subject.rejected.connect(dialog_change_subject.reject)
+        self.button_box_change_subject.accepted.connect(dialog_change_subject.accept)
+        QtCore.QMetaObject.connectSlotsByName(dialog_change_subject)
+
+    def retranslateUi(self, dialog_change_subject):
+        _translate = QtCore.QCoreApplication.translate
+        dialog_change_subject.setWindowTitle(_translate("dialog_change_subject", "Change Subject"))
+        self.lbl_change_subject.setText(_translate("dialog_change_subject", "Change the Subject of Tasks"))
+        self.lbl_subject.setText(_translate("dialog_change_subject", "Subject:"))
+        self.lbl_instruction.setText(_translate("dialog_change_subject", "Please choose the new subject of the selected tasks."))
+
+
+if __name__ == "__main__":
+    import sys
+    app = QtWidgets.QApplication(sys.argv)
+    dialog_change_subject = QtWidgets.QDialog()
+    ui = Ui_dialog_change_subject()
+    ui.setupUi(dialog_change_subject)
+    dialog_change_subject.show()
+    sys.exit(app.exec_())
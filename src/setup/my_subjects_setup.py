@@ -66,7 +66,7 @@ class Ui_mwindow_my_subjects(object):
         self.hori_line_add_subject.setFrameShadow(QtWidgets.QFrame.Sunken)
         self.hori_line_add_subject.setObjectName("hori_line_add_subject")
         self.vert_layout_my_subjects.addWidget(self.hori_line_add_subject)
-        self.list_widget_my_subjects = QtWidgets.QListWidget(self.central_widget)
+        self.list_view_my_subjects = QtWidgets.QListView(self.central_widget)
         palette = QtGui.QPalette()
         brush = QtGui.QBrush(QtGui.QColor(0, 0, 0))
         brush.setStyle(QtCore.Qt.SolidPattern)
@@ -212,17 +212,18 @@ class Ui_mwindow_my_subjects(object):
         brush = QtGui.QBrush(QtGui.QColor(0, 0, 0, 128))
         brush.setStyle(QtCore.Qt.SolidPattern)
         palette.setBrush(QtGui.QPalette.Disabled, QtGui.QPalette.PlaceholderText, brush)
-        self.list_widget_my_subjects.setPalette(palette)
+        self.list_view_my_subjects.setPalette(palette)
         font = QtGui.QFont()
         font.setFamily("Arial")
         font.setPointSize(10)
-        self.list_widget_my_subjects.setFont(font)
-        self.list_widget_my_subjects.setAutoFillBackground(False)
-        self.list_widget_my_subjects.setStyleSheet("background-color: rgba(255, 255, 255, 0)")
-        self.list_widget_my_subjects.setFrameShape(QtWidgets.QFrame.NoFrame)
-        self.list_widget_my_subjects.setFrameShadow(QtWidgets.QFrame.Plain)
-        self.list_widget_my_subjects.setObjectName("list_widget_my_subjects")
-        self.vert_layout_my_subjects.addWidget(self.list_widget_my_subjects)
+        self.list_view_my_subjects.setFont(font)
+        self.list_view_my_subjects.setAutoFillBackground(False)
+        self.list_view_my_subjects.setStyleSheet("background-color: rgba(255, 255, 255, 0)")
+        self.list_view_my_subjects.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.list_view_my_subjects.setFrameShadow(QtWidgets.QFrame.Plain)
+        self.list_view_my_subjects.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.list_view_my_subjects.setObjectName("list_view_my_subjects")
+        self.vert_layout_my_subjects.addWidget(self.list_view_my_subjects)
         self.gridLayout.addLayout(self.vert_layout_my_subjects, 0, 0, 1, 1)
         mwindow_my_subjects.setCentralWidget(self.central_widget)
         self.actionAgenda = QtWidgets.QAction(mwindow_my_subjects)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'task_history.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.2
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_dialog_task_history(object):
+    def setupUi(self, dialog_task_history):
+        dialog_task_history.setObjectName("dialog_task_history")
+        dialog_task_history.resize(600, 450)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(10)
+        dialog_task_history.setFont(font)
+        self.vert_layout_task_history = QtWidgets.QVBoxLayout(dialog_task_history)
+        self.vert_layout_task_history.setObjectName("vert_layout_task_history")
+        self.lbl_task_history = QtWidgets.QLabel(dialog_task_history)
+        font = QtGui.QFont()
+        font.setPointSize(14)
+        self.lbl_task_history.setFont(font)
+        self.lbl_task_history.setObjectName("lbl_task_history")
+        self.vert_layout_task_history.addWidget(self.lbl_task_history)
+        self.hori_line_task_history = QtWidgets.QFrame(dialog_task_history)
+        self.hori_line_task_history.setFrameShape(QtWidgets.QFrame.HLine)
+        self.hori_line_task_history.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.hori_line_task_history.setObjectName("hori_line_task_history")
+        self.vert_layout_task_history.addWidget(self.hori_line_task_history)
+        self.hori_layout_term = QtWidgets.QHBoxLayout()
+        self.hori_layout_term.setObjectName("hori_layout_term")
+        self.lbl_term = QtWidgets.QLabel(dialog_task_history)
+        self.lbl_term.setObjectName("lbl_term")
+        self.hori_layout_term.addWidget(self.lbl_term)
+        self.comb_box_term = QtWidgets.QComboBox(dialog_task_history)
+        self.comb_box_term.setObjectName("comb_box_term")
+        self.hori_layout_term.addWidget(self.comb_box_term)
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.hori_layout_term.addItem(spacerItem)
+        self.vert_layout_task_history.addLayout(self.hori_layout_term)
+        self.table_view_history = QtWidgets.QTableView(dialog_task_history)
+        self.table_view_history.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table_view_history.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table_view_history.setShowGrid(False)
+        self.table_view_history.setObjectName("table_view_history")
+        self.vert_layout_task_history.addWidget(self.table_view_history)
+        self.button_box_task_history = QtWidgets.QDialogButtonBox(dialog_task_history)
+        self.button_box_task_history.setOrientation(QtCore.Qt.Horizontal)
+        self.button_box_task_history.setStandardButtons(QtWidgets.QDialogButtonBox.Close)
+        self.button_box_task_history.setObjectName("button_box_task_history")
+        self.vert_layout_task_history.addWidget(self.button_box_task_history, 0, QtCore.Qt.AlignRight)
+
+        self.retranslateUi(dialog_task_history)
+        self.button_box_task_history.rejected.connect(dialog_task_history.reject)
+        QtCore.QMetaObject.connectSlotsByName(dialog_task_history)
+
+    def retranslateUi(self, dialog_task_history):
+        _translate = QtCore.QCoreApplication.translate
+        dialog_task_history.setWindowTitle(_translate("dialog_task_history", "Task History"))
+        self.lbl_task_history.setText(_translate("dialog_task_history", "Archived Tasks"))
+        self.lbl_term.setText(_translate("dialog_task_history", "Term:"))
+
+
+if __name__ == "__main__":
+    import sys
+    app = QtWidgets.QApplication(sys.argv)
+    dialog_task_history = QtWidgets.QDialog()
+    ui = Ui_dialog_task_history()
+    ui.setupUi(dialog_task_history)
+    dialog_task_history.show()
+    sys.exit(app.exec_())
@@ -48,6 +48,9 @@ class Ui_mwindow_timetable(object):
         self.hori_layout_buttons.addWidget(self.btn_clear_timetable, 0, QtCore.Qt.AlignLeft)
         spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
         self.hori_layout_buttons.addItem(spacerItem)
+        self.comb_box_week = QtWidgets.QComboBox(self.central_widget)
+        self.comb_box_week.setObjectName("comb_box_week")
+        self.hori_layout_buttons.addWidget(self.comb_box_week, 0, QtCore.Qt.AlignRight)
         self.vert_layout_timetable.addLayout(self.hori_layout_buttons)
         self.hori_line_edit_timetable = QtWidgets.QFrame(self.central_widget)
         self.hori_line_edit_timetable.setFrameShape(QtWidgets.QFrame.HLine)
@@ -2,20 +2,39 @@
 
 Users may use the agenda to keep a record of their task list, and they may use
 the timetable to keep track of their lesson schedule.
+
+The windows for My Subjects, Agenda, and Timetable are only created (and their
+data only read) the first time that they are opened, so that the main menu
+appears in the same time regardless of how much data there is. Setting the
+STUDENT_PLANNER_WARM_UP environment variable creates them in the background
+once the main menu has been shown, and setting STUDENT_PLANNER_TIMINGS logs a
+report of how long start-up took.
 """
 
+import logging
+import os
 import sys
+import time
+
+# Recorded before the other imports, so that start-up times include them.
+START_TIME = time.perf_counter()
+
+from PyQt5 import QtWidgets  # noqa: E402
+from PyQt5.QtCore import QTimer  # noqa: E402
+from PyQt5.QtWidgets import QMainWindow, QMessageBox  # noqa: E402
 
-from PyQt5 import QtWidgets
-from PyQt5.QtWidgets import QMainWindow
+from planner.core.instrumentation import (  # noqa: E402
+    configure_logging,
+    timings_enabled,
+)
+from planner.core.storage import LockedError  # noqa: E402
+from setup.student_planner_setup import Ui_mwindow_menu  # noqa: E402
 
-from setup.student_planner_setup import Ui_mwindow_menu
-from agenda import AgendaWindow
-from timetable import TimetableWindow
-from my_subjects import MySubjectsWindow
+logger = logging.getLogger(__name__)
 
 
 def main() -> None:
+    configure_logging()
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle("fusion")
     mwindow_menu = MainMenuWindow()
@@ -23,31 +42,120 @@ def main() -> None:
     sys.exit(app.exec_())
 
 
+def elapsed_ms(start_time: float) -> float:
+    """Calculates the milliseconds elapsed since the given time."""
+    return (time.perf_counter() - start_time) * 1000
+
+
 class MainMenuWindow(QMainWindow, Ui_mwindow_menu):
-    """Sets up the main menu window."""
+    """Sets up the main menu window.
+
+    Attributes:
+        mwindow_agenda: Agenda main window, created when first opened.
+        mwindow_my_subjects: My Subjects main window, created when first opened.
+        mwindow_timetable: Timetable main window, created when first opened.
+        startup_times: Milliseconds taken by each stage of start-up.
+    """
 
     def __init__(self) -> None:
-        self.mwindow_my_subjects = MySubjectsWindow()
-        self.mwindow_agenda = AgendaWindow()
-        self.mwindow_timetable = TimetableWindow()
         super().__init__()
         self.setupUi(self)
+        self.mwindow_my_subjects = None
+        self.mwindow_agenda = None
+        self.mwindow_timetable = None
+        self.startup_times = {"menu created": elapsed_ms(START_TIME)}
 
         self.btn_my_subjects.clicked.connect(self.open_mwindow_my_subjects)
         self.btn_agenda.clicked.connect(self.open_mwindow_agenda)
         self.btn_timetable.clicked.connect(self.open_mwindow_timetable)
 
+        # Runs once the event loop has shown the main menu.
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self) -> None:
+        """Reports the start-up times and warms up the windows if enabled."""
+        self.startup_times["menu shown"] = elapsed_ms(START_TIME)
+        if os.environ.get("STUDENT_PLANNER_WARM_UP"):
+            self.warm_up_windows(
+                [
+                    self.get_mwindow_agenda,
+                    self.get_mwindow_timetable,
+                    self.get_mwindow_my_subjects,
+                ]
+            )
+        elif timings_enabled():
+            self.report_startup_times()
+
+    def warm_up_windows(self, window_getters: list) -> None:
+        """Creates the windows one at a time while the main menu is idle.
+
+        Args:
+            window_getters: Methods which create each of the windows.
+        """
+        if not window_getters:
+            if timings_enabled():
+                self.report_startup_times()
+            return
+        try:
+            window_getters[0]()
+        except LockedError as error:
+            # The window is created, and the error shown, when it is opened.
+            logger.warning("Could not warm up a window: %s", error)
+        QTimer.singleShot(0, lambda: self.warm_up_windows(window_getters[1:]))
+
+    def report_startup_times(self) -> None:
+        """Logs how long each stage of start-up took."""
+        lines = ["Start-up times:"]
+        for stage, time_ms in self.startup_times.items():
+            lines.append(f"    {stage}: {time_ms:.1f} ms")
+        logger.info("\n".join(lines))
+
+    def get_mwindow_my_subjects(self) -> QMainWindow:
+        """Gets the main window for My Subjects, creating it if needed."""
+        if self.mwindow_my_subjects is None:
+            start_time = time.perf_counter()
+            from my_subjects import MySubjectsWindow
+
+            self.mwindow_my_subjects = MySubjectsWindow()
+            self.startup_times["my subjects created"] = elapsed_ms(start_time)
+        return self.mwindow_my_subjects
+
+    def get_mwindow_agenda(self) -> QMainWindow:
+        """Gets the main window for Agenda, creating it if needed."""
+        if self.mwindow_agenda is None:
+            start_time = time.perf_counter()
+            from agenda import AgendaWindow
+
+            self.mwindow_agenda = AgendaWindow()
+            self.startup_times["agenda created"] = elapsed_ms(start_time)
+        return self.mwindow_agenda
+
+    def get_mwindow_timetable(self) -> QMainWindow:
+        """Gets the main window for Timetable, creating it if needed."""
+        if self.mwindow_timetable is None:
+            start_time = time.perf_counter()
+            from timetable import TimetableWindow
+
+            self.mwindow_timetable = TimetableWindow()
+            self.startup_times["timetable created"] = elapsed_ms(start_time)
+        return self.mwindow_timetable
+
     def open_mwindow_my_subjects(self) -> None:
         """Opens the main window for My Subjects."""
-        self.mwindow_my_subjects.show()
+        self.get_mwindow_my_subjects().show()
 
     def open_mwindow_agenda(self) -> None:
-        """Opens the main window for Agenda."""
-        self.mwindow_agenda.show()
+        """Opens the main window for Agenda, unless its tasks are locked."""
+        try:
+            mwindow_agenda = self.get_mwindow_agenda()
+        except LockedError as error:
+            QMessageBox.warning(self, "Agenda", str(error))
+            return
+        mwindow_agenda.show()
 
     def open_mwindow_timetable(self) -> None:
         """Opens the main window for Timetable."""
-        self.mwindow_timetable.show()
+        self.get_mwindow_timetable().show()
 
 
 if __name__ == "__main__":
@@ -1,19 +1,32 @@
 """A timetable which enables students to keep track of their lesson schedule.
 
-Users may enter the subject, teacher, and room for each timetable slot.
+Users may enter the subject, teacher, and room for each timetable slot. The
+timetable may have any number of days and periods, and may rotate through
+several weeks, one of which is displayed at a time.
 """
 
-import json
+import logging
 import sys
 
 from PyQt5 import QtWidgets
+from PyQt5.QtGui import QCloseEvent
 from PyQt5.QtWidgets import QDialog, QMainWindow
 
+from my_subjects import subject_model
+from persistence import WriteBehindSaver
+from planner.core.instrumentation import configure_logging, timed
+from planner.core.records import EMPTY_LESSON, Lesson
+from planner.core.timetable import open_timetable
+from planner.core.timetable_grid import day_name, period_name, week_name
 from setup.edit_timetable_setup import Ui_dialog_edit_timetable
 from setup.timetable_setup import Ui_mwindow_timetable
+from undo import DeltaCommand, UndoStack
+
+logger = logging.getLogger(__name__)
 
 
 def main() -> None:
+    configure_logging()
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle("fusion")
     mwindow_timetable = TimetableWindow()
@@ -21,28 +34,6 @@ def main() -> None:
     sys.exit(app.exec_())
 
 
-def read_lessons() -> list:
-    """Reads JSON files for list of lessons to display in timetable.
-
-    Returns:
-        timetable: A list of lessons in the timetable.
-    """
-    with open("resources/timetable.json", "r") as outfile:
-        try:
-            timetable = json.load(outfile)
-        except ValueError:
-            print("Empty JSON file.")
-            timetable = []
-
-        # Adds empty dictionary values for empty timetable slots.
-        missing_lessons = 25 - len(timetable)
-        for index in range(missing_lessons):
-            lesson = {"subject": " ", "teacher": " ", "room": " "}
-            timetable.append(lesson)
-
-    return timetable
-
-
 class EditTimetableDialog(QDialog, Ui_dialog_edit_timetable):
     """Sets up the Edit Timetable dialog."""
 
@@ -51,19 +42,56 @@ class EditTimetableDialog(QDialog, Ui_dialog_edit_timetable):
         self.setupUi(self)
 
 
+class SetLessonCommand(DeltaCommand):
+    """Puts a lesson in a timetable slot, holding the lesson it replaced.
+
+    Attributes:
+        key: The (week, day, period) of the timetable slot.
+        new_lesson: Lesson which is put in the slot.
+        old_lesson: Lesson which was in the slot before.
+        window: Timetable window which displays the slot.
+    """
+
+    def __init__(
+        self, window: "TimetableWindow", key: tuple, new_lesson: Lesson
+    ) -> None:
+        text = "Clear Slot" if new_lesson.is_empty() else "Edit Slot"
+        super().__init__(text, 1)
+        self.key = key
+        self.new_lesson = new_lesson
+        self.old_lesson = window.timetable.get(key)
+        self.window = window
+
+    def redo(self) -> None:
+        self.window.save_timetable_list(self.key, self.new_lesson)
+
+    def undo(self) -> None:
+        self.window.save_timetable_list(self.key, self.old_lesson)
+
+
 class TimetableWindow(QMainWindow, Ui_mwindow_timetable):
     """Sets up the Timetable main window.
 
     Attributes:
         Dialog: Dialog window for editing a timetable slot.
-        timetable: List of lessons in the timetable.
+        dirty_slots: Keys of the slots whose cells are out of date.
+        saver: Saves changes to the timetable in the background.
+        timetable: Timetable of the lessons in the occupied slots.
+        undo_stack: Edits to the timetable which can be undone.
+        week: Week of the timetable which is displayed.
     """
 
     def __init__(self) -> None:
         super().__init__()
         self.Dialog = EditTimetableDialog()
-        self.timetable = read_lessons()
+        self.Dialog.comb_box_subject.setModel(subject_model())
+        self.timetable = open_timetable()
+        self.week = 0
+        self.dirty_slots = set()
+        self.saver = WriteBehindSaver(self.timetable.snapshot, "timetable.save")
         self.setupUi(self)
+        self.undo_stack = UndoStack(self)
+        self.undo_stack.add_actions(self)
         self.setStyleSheet(
             """QTableWidget {background-color: transparent;}
             QHeaderView::section {background-color: transparent;}
@@ -72,56 +100,134 @@ class TimetableWindow(QMainWindow, Ui_mwindow_timetable):
         )
         self.btn_edit_timetable.clicked.connect(self.open_dialog_edit_timetable)
         self.btn_clear_timetable.clicked.connect(self.clear_timetable_slot)
+
+        # Sizes the grid to the timetable, with a row for each period and a
+        # column for each day.
+        dimensions = self.timetable.dimensions
+        self.table_widget_timetable.setRowCount(dimensions.periods)
+        self.table_widget_timetable.setColumnCount(dimensions.days)
+        self.table_widget_timetable.setVerticalHeaderLabels(
+            [period_name(period) for period in range(dimensions.periods)]
+        )
+        self.table_widget_timetable.setHorizontalHeaderLabels(
+            [day_name(day) for day in range(dimensions.days)]
+        )
+
+        # Only shows the choice of week for timetables of more than one week.
+        self.comb_box_week.addItems(
+            [week_name(week) for week in range(dimensions.weeks)]
+        )
+        self.comb_box_week.setVisible(dimensions.weeks > 1)
+        self.comb_box_week.currentIndexChanged.connect(self.show_week)
         self.update_timetable()
 
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Finishes saving any changes when the window is closed."""
+        self.saver.flush()
+        super().closeEvent(event)
+
     def open_dialog_edit_timetable(self) -> None:
         """Opens the dialog window for editing the timetable."""
         self.Dialog.button_box_edit_timetable.accepted.disconnect()
         self.Dialog.button_box_edit_timetable.accepted.connect(self.save_lesson)
-
-        # Populates the combo box with subject options.
-        with open("resources/subject_list.txt", "r") as data_file:
-            self.Dialog.comb_box_subject.clear()
-            subject_list = data_file.readlines()
-            for line in subject_list:
-                self.Dialog.comb_box_subject.addItem(line.strip("\n"))
         self.Dialog.open()
 
+    def show_week(self, week: int) -> None:
+        """Displays the lessons in a week of the timetable."""
+        self.week = week
+        self.update_timetable()
+
     def update_timetable(self) -> None:
-        """Populates the timetable with all lessons."""
+        """Populates the timetable with the lessons in the displayed week."""
+        with timed("timetable.render"):
+            self._render_timetable()
+
+    def _render_timetable(self) -> None:
+        """Adds the details of each lesson to the cells of the timetable.
+
+        The cells of free slots are left empty, so only the cells of occupied
+        slots are created.
+        """
+        self.dirty_slots.clear()
+        self.table_widget_timetable.clearContents()
+        for day, period, lesson in self.timetable.week_lessons(self.week):
+            self.table_widget_timetable.setItem(
+                period, day, QtWidgets.QTableWidgetItem(lesson.display())
+            )
+
         # Resizes columns and rows to fit the contents.
-        self.table_widget_timetable.horizontalHeader().setSectionResizeMode(
-            QtWidgets.QHeaderView.ResizeToContents
-        )
-        self.table_widget_timetable.verticalHeader().setSectionResizeMode(
-            QtWidgets.QHeaderView.ResizeToContents
-        )
+        self.table_widget_timetable.resizeColumnsToContents()
+        self.table_widget_timetable.resizeRowsToContents()
 
-        # Adds lesson details to each cell in the timetable.
-        for row_index, row in enumerate(self.timetable[::5]):
-            for column_index, column in enumerate(range(5)):
-                index = (row_index * 5) + column_index
-                lesson_details = (
-                    (self.timetable[index]["subject"])
-                    + "\n"
-                    + (self.timetable[index]["teacher"])
-                    + "\n"
-                    + (self.timetable[index]["room"])
-                )
+    def update_dirty_cells(self) -> None:
+        """Updates only the cells of the slots which have changed."""
+        with timed("timetable.render"):
+            self._render_dirty_cells()
+
+    def _render_dirty_cells(self) -> None:
+        """Updates the cells of changed slots in the displayed week.
+
+        Only the rows and columns of the changed cells are resized to fit
+        their contents, so an edit takes the same time however many other
+        cells there are.
+        """
+        rows = set()
+        columns = set()
+        for key in self.dirty_slots:
+            week, day, period = key
+            if week != self.week:
+                continue
+            lesson = self.timetable.get(key)
+            item = self.table_widget_timetable.item(period, day)
+            if lesson.is_empty():
+                self.table_widget_timetable.takeItem(period, day)
+            elif item is None:
                 self.table_widget_timetable.setItem(
-                    row_index, column_index, QtWidgets.QTableWidgetItem(lesson_details)
+                    period, day, QtWidgets.QTableWidgetItem(lesson.display())
                 )
+            else:
+                item.setText(lesson.display())
+            rows.add(period)
+            columns.add(day)
+        self.dirty_slots.clear()
 
-    def save_timetable_list(self) -> None:
-        """Updates the JSON file with the current timetable list."""
-        with open("resources/timetable.json", "w") as outfile:
-            json.dump(self.timetable, outfile, ensure_ascii=False, indent=4)
-        self.update_timetable()
+        for row in rows:
+            self.table_widget_timetable.resizeRowToContents(row)
+        for column in columns:
+            self.table_widget_timetable.resizeColumnToContents(column)
+
+    def selected_slot(self):
+        """Gets the (week, day, period) of the selected timetable slot.
+
+        Returns:
+            The key of the selected slot, or None if no slot is selected.
+        """
+        period = self.table_widget_timetable.currentRow()
+        day = self.table_widget_timetable.currentColumn()
+        if period < 0 or day < 0:
+            return None
+        return self.week, day, period
+
+    def save_timetable_list(self, key: tuple, lesson: Lesson) -> None:
+        """Puts a lesson in a timetable slot, and schedules it to be saved.
+
+        If the slot is in another week, that week is displayed, so that the
+        change to a slot which is undone or redone can be seen.
+
+        Args:
+            key: The (week, day, period) of the timetable slot.
+            lesson: The lesson to put in the slot.
+        """
+        if key[0] != self.week:
+            self.comb_box_week.setCurrentIndex(key[0])
+        self.timetable.set(key, lesson)
+        self.saver.mark_dirty()
+        self.dirty_slots.add(key)
+        self.update_dirty_cells()
 
     def save_lesson(self) -> None:
         """Saves the lesson to the selected timetable slot."""
-        selected_row = self.table_widget_timetable.currentRow()
-        selected_column = self.table_widget_timetable.currentColumn()
+        key = self.selected_slot()
         lesson_subject = self.Dialog.comb_box_subject.currentText()
         lesson_teacher = self.Dialog.line_edit_teacher.text()
         lesson_room = self.Dialog.line_edit_room.text()
@@ -136,26 +242,21 @@ class TimetableWindow(QMainWindow, Ui_mwindow_timetable):
                 "Your room input exceeds 30 characters. Please try again."
             )
         else:
-            lesson = {
-                "subject": lesson_subject,
-                "teacher": lesson_teacher,
-                "room": lesson_room,
-            }
-            index = (selected_row * 5) + selected_column
-            self.timetable[index] = lesson
-            self.save_timetable_list()
+            if key is not None:
+                lesson = Lesson(sys.intern(lesson_subject), lesson_teacher, lesson_room)
+                self.edit_slot(key, lesson)
             self.Dialog.close()
 
     # Clears the lesson from the selected timetable slot.
     def clear_timetable_slot(self) -> None:
-        selected_row = self.table_widget_timetable.currentRow()
-        selected_column = self.table_widget_timetable.currentColumn()
-
-        # Removes the lesson details from the timetable slot.
-        lesson = {"subject": "", "teacher": "", "room": ""}
-        index = (selected_row * 5) + selected_column
-        self.timetable[index] = lesson
-        self.save_timetable_list()
+        key = self.selected_slot()
+        if key is not None:
+            self.edit_slot(key, EMPTY_LESSON)
+
+    def edit_slot(self, key: tuple, lesson: Lesson) -> None:
+        """Puts a lesson in a timetable slot as an edit which can be undone."""
+        if self.timetable.get(key) != lesson:
+            self.undo_stack.push(SetLessonCommand(self, key, lesson))
 
 
 # Opens the main window when the program is executed.
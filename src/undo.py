@@ -0,0 +1,85 @@
+"""Undoing and redoing the edits made in the windows of the student planner.
+
+Each window pushes its edits onto an undo stack as commands which hold only
+the change that they make, such as the IDs of some tasks with their old and
+new subjects, rather than a copy of the data. Undoing or redoing a command
+makes its change through the same model methods as the original edit, so only
+the changed rows are displayed again and the change is saved by the same
+write-behind saver. Each step therefore takes time in proportion to the size
+of its change, however many tasks, lessons, or subjects there are.
+
+The memory used by the commands on a stack is bounded. A stack keeps at most
+UNDO_LIMIT commands, which hold at most UNDO_BUDGET records between them.
+"""
+
+import logging
+
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import QUndoCommand, QUndoStack, QWidget
+
+logger = logging.getLogger(__name__)
+
+# Number of edits which can be undone in each window.
+UNDO_LIMIT = 100
+
+# Number of records, such as tasks or lessons, which the commands on a stack
+# may hold between them.
+UNDO_BUDGET = 100_000
+
+
+class DeltaCommand(QUndoCommand):
+    """An edit which can be undone, holding only the change that it makes.
+
+    Subclasses implement redo and undo to make and reverse the change.
+
+    Attributes:
+        size: Number of records held by the command, which is counted against
+              the budget of the stack.
+    """
+
+    def __init__(self, text: str, size: int) -> None:
+        super().__init__(text)
+        self.size = size
+
+
+class UndoStack(QUndoStack):
+    """An undo stack which bounds the memory used by its commands.
+
+    A command which would take the commands on the stack past the budget
+    clears the stack first, and a command which is larger than the budget by
+    itself is made without being kept on the stack, so it cannot be undone.
+
+    Attributes:
+        budget: Number of records which the commands on the stack may hold
+                between them.
+    """
+
+    def __init__(
+        self, parent: QWidget, limit: int = UNDO_LIMIT, budget: int = UNDO_BUDGET
+    ) -> None:
+        super().__init__(parent)
+        self.setUndoLimit(limit)
+        self.budget = budget
+
+    def push(self, command: DeltaCommand) -> None:
+        """Makes the change of a command and keeps it to be undone."""
+        if command.size > self.budget:
+            logger.info("%s cannot be undone, as it is too large", command.text())
+            command.redo()
+            self.clear()
+            return
+
+        # The commands which could be redone are discarded by the push.
+        kept_size = sum(self.command(index).size for index in range(self.index()))
+        if kept_size + command.size > self.budget:
+            logger.debug("Clearing the undo stack to stay within its budget")
+            self.clear()
+        super().push(command)
+
+    def add_actions(self, window: QWidget) -> None:
+        """Adds Undo and Redo actions with the standard shortcuts to a window."""
+        undo_action = self.createUndoAction(window)
+        undo_action.setShortcut(QKeySequence.Undo)
+        redo_action = self.createRedoAction(window)
+        redo_action.setShortcut(QKeySequence.Redo)
+        window.addActions([undo_action, redo_action])